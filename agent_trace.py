@@ -0,0 +1,172 @@
+"""
+Supply Chain Crisis Manager - Agent trace capture
+Turns Bedrock Agent trace events into a per-step latency timeline and
+appends one JSON line per invocation to a local log
+"""
+
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+AGENT_TRACE_ENABLED = os.getenv('AGENT_TRACE_ENABLED', 'true').lower() == 'true'
+AGENT_TRACE_LOG = os.getenv(
+    'AGENT_TRACE_LOG',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'agent_traces.jsonl')
+)
+
+_log_lock = threading.Lock()
+
+
+class AgentTrace:
+    """Timeline of one agent invocation, built from its trace events
+
+    Steps are timed by arrival on the stream: a model call runs from its
+    modelInvocationInput to its modelInvocationOutput, a tool call from its
+    invocationInput to the matching observation.
+    """
+
+    def __init__(self, prompt: str, session_id: str):
+        self.prompt = prompt
+        self.session_id = session_id
+        self.started_at = datetime.now()
+        self.success = False
+        self.error = None
+        self.time_to_first_byte = None
+        self.total_seconds = None
+        self.retries = 0
+        self.hedged = False
+        self.steps = []
+        self._started = time.perf_counter()
+        self._open = {}
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._started
+
+    def add(self, event: dict, at: float = None):
+        """Record one 'trace' event from the completion stream (received at 'at' seconds)"""
+
+        if at is None:
+            at = self.elapsed()
+
+        for phase, body in event.get('trace', {}).items():
+            phase_name = phase.replace('Trace', '')
+
+            if phase == 'failureTrace':
+                self._add_step('failure', phase_name, body.get('failureReason', 'Unknown failure'), at)
+                continue
+
+            if not isinstance(body, dict):
+                continue
+
+            for kind, detail in body.items():
+                if not isinstance(detail, dict):
+                    continue
+                trace_id = detail.get('traceId')
+
+                if kind == 'modelInvocationInput':
+                    self._open[('model', trace_id)] = self._add_step('model', phase_name, f"{phase_name} model call", at)
+
+                elif kind == 'modelInvocationOutput':
+                    step = self._close(('model', trace_id), at)
+                    usage = detail.get('metadata', {}).get('usage', {})
+                    if step is not None:
+                        step['input_tokens'] = usage.get('inputTokens', 0)
+                        step['output_tokens'] = usage.get('outputTokens', 0)
+
+                elif kind == 'invocationInput':
+                    action = detail.get('actionGroupInvocationInput')
+                    params = None
+                    if action is not None:
+                        name = f"{action.get('actionGroupName', '')}.{action.get('function', '')}"
+                        params = {param['name']: param.get('value') for param in action.get('parameters', [])}
+                    elif 'knowledgeBaseLookupInput' in detail:
+                        name = "knowledge base lookup"
+                    else:
+                        name = detail.get('invocationType', 'invocation').lower()
+                    step = self._add_step('tool', phase_name, name, at)
+                    if params:
+                        step['params'] = params
+                    self._open[('tool', trace_id)] = step
+
+                elif kind == 'observation':
+                    if detail.get('type') == 'FINISH':
+                        self._add_step('finish', phase_name, "final answer", at)
+                    else:
+                        self._close(('tool', trace_id), at)
+
+                elif kind == 'rationale':
+                    self._add_step('rationale', phase_name, "reasoning", at)
+
+    def add_tool_call(self, name: str, start: float, end: float, params: dict = None):
+        """Record a tool call made outside the agent (e.g. by the fast path)"""
+
+        step = self._add_step('tool', 'fast_path', name, start)
+        step['duration'] = round(end - start, 3)
+        if params:
+            step['params'] = params
+
+    def _add_step(self, step_type: str, phase: str, name: str, at: float) -> dict:
+        step = {'type': step_type, 'phase': phase, 'name': name, 'start': round(at, 3), 'duration': 0.0}
+        self.steps.append(step)
+        return step
+
+    def _close(self, key, at: float):
+        step = self._open.pop(key, None)
+        if step is not None:
+            step['duration'] = round(at - step['start'], 3)
+        return step
+
+    def finish(self, success: bool, error: str = None):
+        self.success = success
+        self.error = error
+        self.total_seconds = round(self.elapsed(), 3)
+
+        # Anything still open ran until the end of the stream
+        for key in list(self._open):
+            self._close(key, self.total_seconds)
+
+    def totals(self) -> dict:
+        """Time and token totals per kind of step"""
+
+        model_steps = [step for step in self.steps if step['type'] == 'model']
+        tool_steps = [step for step in self.steps if step['type'] == 'tool']
+
+        return {
+            'orchestration_steps': sum(1 for step in model_steps if step['phase'] == 'orchestration'),
+            'model_calls': len(model_steps),
+            'model_seconds': round(sum(step['duration'] for step in model_steps), 3),
+            'tool_calls': len(tool_steps),
+            'tool_seconds': round(sum(step['duration'] for step in tool_steps), 3),
+            'input_tokens': sum(step.get('input_tokens', 0) for step in model_steps),
+            'output_tokens': sum(step.get('output_tokens', 0) for step in model_steps)
+        }
+
+    def to_record(self) -> dict:
+        return {
+            'started_at': self.started_at.isoformat(),
+            'session_id': self.session_id,
+            'prompt': self.prompt,
+            'success': self.success,
+            'error': self.error,
+            'time_to_first_byte': self.time_to_first_byte,
+            'total_seconds': self.total_seconds,
+            'retries': self.retries,
+            'hedged': self.hedged,
+            'totals': self.totals(),
+            'steps': self.steps
+        }
+
+
+def write_trace(trace: AgentTrace, path: str = AGENT_TRACE_LOG):
+    """Append the trace as one JSON line to the local trace log"""
+
+    line = json.dumps(trace.to_record())
+
+    try:
+        with _log_lock:
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+    except OSError as e:
+        print(f"Could not write agent trace: {str(e)}")
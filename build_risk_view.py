@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Supply Chain Crisis Manager - Risk View Builder
+Materializes every supplier x location risk score and the alternative
+rankings into risk_view.json, next to the source JSON files.
+
+Run: python build_risk_view.py [--upload]
+"""
+
+import argparse
+import json
+import os
+
+import boto3
+
+from lambda1 import S3_BUCKET, RISK_VIEW_KEY, build_risk_view
+
+SOURCE_FILES = ['supplier_risks.json', 'location_risks.json', 'alternatives.json']
+
+def load_sources(data_dir):
+    """Load the source datasets from a local directory"""
+
+    sources = []
+    for filename in SOURCE_FILES:
+        with open(os.path.join(data_dir, filename), encoding='utf-8') as f:
+            sources.append(json.load(f))
+    return sources
+
+def publish_view(view, body):
+    """Upload the view to S3, both as the live key and as a versioned copy"""
+
+    s3 = boto3.client('s3')
+    base, ext = os.path.splitext(RISK_VIEW_KEY)
+    for key in (f"{base}-{view['version']}{ext}", RISK_VIEW_KEY):
+        s3.put_object(Bucket=S3_BUCKET, Key=key, Body=body, ContentType='application/json')
+        print(f"Uploaded s3://{S3_BUCKET}/{key}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the precomputed supplier risk view")
+    parser.add_argument('--data-dir', default=os.path.dirname(os.path.abspath(__file__)),
+                        help="Directory holding the source JSON files")
+    parser.add_argument('--upload', action='store_true',
+                        help="Publish the view to the S3 data bucket")
+    args = parser.parse_args()
+
+    supplier_risks, location_risks, alternatives = load_sources(args.data_dir)
+    view = build_risk_view(supplier_risks, location_risks, alternatives)
+    body = json.dumps(view, separators=(',', ':'))
+
+    output_path = os.path.join(args.data_dir, os.path.basename(RISK_VIEW_KEY))
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(body)
+
+    print(f"Risk view {view['version']}: {len(view['pairs'])} supplier/location pairs, "
+          f"{len(view['alternatives'])} components -> {output_path}")
+
+    if args.upload:
+        publish_view(view, body)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Supply Chain Crisis Manager - Bulk questions
+Turns an uploaded CSV into agent questions and answers them concurrently,
+each in its own agent session, with a cap on how many run at once
+"""
+
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from supply_chain_agent import AgentJob
+
+BULK_PARALLELISM = int(os.getenv('BULK_PARALLELISM', '4'))
+BULK_MAX_ROWS = int(os.getenv('BULK_MAX_ROWS', '500'))
+
+
+def questions_from_csv(file) -> list:
+    """Questions from a CSV with a 'question' column or supplier rows
+
+    Supplier rows ('supplier', optional 'location' or 'component') become
+    the templated questions the fast path answers without the agent.
+    """
+
+    frame = pd.read_csv(file, dtype=str).fillna('')
+    frame.columns = [str(column).strip().lower() for column in frame.columns]
+
+    if 'question' in frame.columns:
+        questions = [question.strip() for question in frame['question']]
+
+    elif 'supplier' in frame.columns:
+        questions = []
+        for row in frame.to_dict('records'):
+            supplier = row['supplier'].strip()
+            if row.get('component', '').strip():
+                questions.append(f"Find alternative {row['component'].strip()} suppliers for {supplier}")
+            elif row.get('location', '').strip():
+                questions.append(f"What's the risk level for {supplier} in {row['location'].strip()}?")
+            else:
+                questions.append(f"What's the risk level for {supplier}?")
+
+    else:
+        raise ValueError("CSV needs a 'question' column or a 'supplier' column (with 'location' or 'component')")
+
+    questions = [question for question in questions if question]
+    if len(questions) > BULK_MAX_ROWS:
+        raise ValueError(f"CSV has {len(questions)} questions; the limit is {BULK_MAX_ROWS}")
+    return questions
+
+
+class BulkRun:
+    """One uploaded batch: a job per question on a pool of its own"""
+
+    def __init__(self, agent, questions: list, parallelism: int = BULK_PARALLELISM):
+        self.agent = agent
+        self.batch_id = uuid.uuid4().hex[:8]
+        self.jobs = [AgentJob(question, f"bulk-{self.batch_id}-{index}") for index, question in enumerate(questions)]
+        self._executor = ThreadPoolExecutor(max_workers=parallelism, thread_name_prefix=f"bulk-{self.batch_id}")
+        self._futures = [self._executor.submit(job.run, agent) for job in self.jobs]
+        self._executor.shutdown(wait=False)
+
+    def cancel(self):
+        """Drop the questions that have not started yet"""
+
+        for job, future in zip(self.jobs, self._futures):
+            if future.cancel():
+                job.done = True
+                job.success = False
+                job.text = "Cancelled"
+
+    @property
+    def finished(self) -> int:
+        return sum(1 for job in self.jobs if job.done)
+
+    @property
+    def done(self) -> bool:
+        return self.finished == len(self.jobs)
+
+    def results(self) -> pd.DataFrame:
+        """One row per question, in upload order"""
+
+        rows = []
+        for index, job in enumerate(self.jobs, 1):
+            if job.done:
+                status = "answered" if job.success else "failed"
+            else:
+                status = "running" if job.started else "queued"
+
+            rows.append({
+                "#": index,
+                "question": job.prompt,
+                "status": status,
+                "path": ("direct" if job.stats.get("fast_path") else "agent") if job.started else "",
+                "latency (s)": job.stats.get("total_time"),
+                "answer": job.text
+            })
+        return pd.DataFrame(rows)
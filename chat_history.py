@@ -0,0 +1,209 @@
+"""
+Supply Chain Crisis Manager - Chat history store
+Keeps the most recent messages of a session in memory and spills older
+ones to a local SQLite transcript, so long sessions stay cheap to rerun.
+Transcripts are deleted when their session is cleared or replaced, and
+those of sessions that stopped spilling CHAT_TRANSCRIPT_MAX_AGE_SECONDS ago
+(abandoned browser tabs) are pruned.
+"""
+
+import json
+import os
+import sqlite3
+import time
+from collections import deque
+from contextlib import closing
+from datetime import datetime
+
+CHAT_TRANSCRIPT_DB = os.getenv(
+    'CHAT_TRANSCRIPT_DB',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'chat_transcripts.db')
+)
+CHAT_MEMORY_MESSAGES = int(os.getenv('CHAT_MEMORY_MESSAGES', '50'))
+CHAT_TRANSCRIPT_MAX_AGE_SECONDS = int(os.getenv('CHAT_TRANSCRIPT_MAX_AGE_SECONDS', str(7 * 24 * 3600)))
+
+
+def _encode(message: dict) -> str:
+    return json.dumps(message, default=lambda value: {'__datetime__': value.isoformat()})
+
+
+def _decode(body: str) -> dict:
+    def restore(value):
+        if '__datetime__' in value:
+            return datetime.fromisoformat(value['__datetime__'])
+        return value
+    return json.loads(body, object_hook=restore)
+
+
+def _connect(db_path: str):
+    # Streamlit reruns may use a different thread, so connect per operation
+    db = sqlite3.connect(db_path, timeout=5)
+    db.execute(
+        "CREATE TABLE IF NOT EXISTS messages "
+        "(session_id TEXT NOT NULL, seq INTEGER NOT NULL, body TEXT NOT NULL, "
+        "PRIMARY KEY (session_id, seq))"
+    )
+    db.execute(
+        "CREATE TABLE IF NOT EXISTS sessions "
+        "(session_id TEXT PRIMARY KEY, spilled_at REAL NOT NULL)"
+    )
+    return db
+
+
+def prune_transcripts(db_path: str = CHAT_TRANSCRIPT_DB,
+                      max_age_seconds: float = CHAT_TRANSCRIPT_MAX_AGE_SECONDS) -> int:
+    """Delete the transcripts of sessions that last spilled over max_age_seconds ago
+
+    Returns how many messages were deleted.
+    """
+
+    cutoff = time.time() - max_age_seconds
+    with closing(_connect(db_path)) as db:
+        # Rows without a sessions entry predate it and are treated as expired
+        deleted = db.execute(
+            "DELETE FROM messages WHERE session_id NOT IN "
+            "(SELECT session_id FROM sessions WHERE spilled_at >= ?)",
+            (cutoff,)
+        ).rowcount
+        db.execute("DELETE FROM sessions WHERE spilled_at < ?", (cutoff,))
+        db.commit()
+    return deleted
+
+
+class ChatHistory:
+    """Ring buffer of recent chat messages backed by a SQLite transcript
+
+    Messages are numbered from 0 in conversation order. The newest
+    max_in_memory of them live in memory; older ones are on disk.
+    """
+
+    def __init__(self, session_id: str, max_in_memory: int = CHAT_MEMORY_MESSAGES,
+                 db_path: str = CHAT_TRANSCRIPT_DB):
+        self.session_id = session_id
+        self.max_in_memory = max_in_memory
+        self.db_path = db_path
+        self.spilled = 0
+        self.recent = deque()
+
+    def _connect(self):
+        return _connect(self.db_path)
+
+    def _spill(self):
+        """Move messages beyond the in-memory bound to the transcript"""
+
+        if len(self.recent) <= self.max_in_memory:
+            return
+
+        # Each session prunes abandoned transcripts once, when it first spills
+        if not self.spilled:
+            prune_transcripts(self.db_path)
+
+        rows = []
+        while len(self.recent) > self.max_in_memory:
+            rows.append((self.session_id, self.spilled, _encode(self.recent.popleft())))
+            self.spilled += 1
+
+        with closing(self._connect()) as db:
+            db.executemany("INSERT OR REPLACE INTO messages (session_id, seq, body) VALUES (?, ?, ?)", rows)
+            db.execute(
+                "INSERT OR REPLACE INTO sessions (session_id, spilled_at) VALUES (?, ?)",
+                (self.session_id, time.time())
+            )
+            db.commit()
+
+    def append(self, message: dict):
+        self.recent.append(message)
+        self._spill()
+
+    def insert_after(self, request_id: str, message: dict):
+        """Insert message right after the one with request_id (or at the end)
+
+        A question that has already spilled gets its answer written next to
+        it in the transcript, so the answer never lands after newer messages.
+        """
+
+        for index, existing in enumerate(self.recent):
+            if existing.get("request_id") == request_id:
+                self.recent.insert(index + 1, message)
+                self._spill()
+                return
+
+        if self.spilled and self._insert_spilled(request_id, message):
+            return
+
+        self.recent.append(message)
+        self._spill()
+
+    def _insert_spilled(self, request_id: str, message: dict) -> bool:
+        """Insert message after a spilled one, renumbering the rest of the transcript"""
+
+        with closing(self._connect()) as db:
+            # The question is usually among the newest spilled messages
+            cursor = db.execute(
+                "SELECT seq, body FROM messages WHERE session_id = ? ORDER BY seq DESC",
+                (self.session_id,)
+            )
+            for seq, body in cursor:
+                if _decode(body).get("request_id") == request_id:
+                    break
+            else:
+                return False
+            cursor.close()
+
+            # Shift later messages up by one, through negative seqs so the
+            # primary key never collides halfway through the update
+            db.execute("UPDATE messages SET seq = -seq - 2 WHERE session_id = ? AND seq > ?", (self.session_id, seq))
+            db.execute("UPDATE messages SET seq = -seq - 1 WHERE session_id = ? AND seq < 0", (self.session_id,))
+            db.execute(
+                "INSERT INTO messages (session_id, seq, body) VALUES (?, ?, ?)",
+                (self.session_id, seq + 1, _encode(message))
+            )
+            db.commit()
+
+        self.spilled += 1
+        return True
+
+    def tail(self, count: int) -> list:
+        """The newest count messages"""
+        return self.page(max(0, len(self) - count), len(self))
+
+    def page(self, start: int, stop: int) -> list:
+        """Messages start..stop-1, read from disk where they were spilled"""
+
+        messages = []
+
+        if start < self.spilled:
+            with closing(self._connect()) as db:
+                rows = db.execute(
+                    "SELECT body FROM messages WHERE session_id = ? AND seq >= ? AND seq < ? ORDER BY seq",
+                    (self.session_id, start, min(stop, self.spilled))
+                ).fetchall()
+            messages.extend(_decode(body) for (body,) in rows)
+
+        for index in range(max(start, self.spilled), min(stop, len(self))):
+            messages.append(self.recent[index - self.spilled])
+
+        return messages
+
+    def history(self) -> list:
+        """The whole conversation, spilled messages included"""
+        return self.page(0, len(self))
+
+    def clear(self):
+        """Forget the conversation, including its spilled transcript"""
+
+        if self.spilled:
+            with closing(self._connect()) as db:
+                db.execute("DELETE FROM messages WHERE session_id = ?", (self.session_id,))
+                db.execute("DELETE FROM sessions WHERE session_id = ?", (self.session_id,))
+                db.commit()
+
+        self.spilled = 0
+        self.recent.clear()
+
+    def __len__(self):
+        return self.spilled + len(self.recent)
+
+    def __iter__(self):
+        """Iterate over the in-memory tail only; history() includes spilled messages"""
+        return iter(self.recent)
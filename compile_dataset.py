@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Supply Chain Crisis Manager - Dataset Compiler
+Validates the source datasets, cross-checks the supplier names and locations
+they share, and writes dataset_bundle.json: the sources plus derived fields
+(normalized names, parsed lead times, split locations) under the content-hash
+version the apps and the Lambda key their caches on.
+
+Run: python compile_dataset.py [--strict] [--upload]
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from datetime import datetime
+
+import boto3
+
+from build_risk_view import load_sources
+from lambda1 import S3_BUCKET, DATASET_BUNDLE_KEY, dataset_version, normalize_name
+
+# Capacity labels in use; capacity is only displayed, so others just warn
+CAPACITY_LEVELS = ['Low', 'Medium', 'High', 'Very High', 'Growing']
+
+# Locations that describe a footprint rather than a country
+FOOTPRINT_LOCATIONS = {'Global'}
+
+LEAD_TIME_PATTERN = re.compile(r"(\d+)(?:\s*-\s*(\d+))?\s*weeks?", re.IGNORECASE)
+
+def split_locations(location):
+    """'USA/Europe' -> ['USA', 'Europe']"""
+    return [part.strip() for part in re.split(r'[/,&]', location) if part.strip()]
+
+def parse_lead_time(lead_time):
+    """'8-12 weeks' -> [8, 12], or None when it doesn't parse"""
+
+    found = LEAD_TIME_PATTERN.fullmatch(lead_time.strip())
+    if found is None:
+        return None
+    low = int(found.group(1))
+    high = int(found.group(2) or low)
+    return [low, high] if low <= high else None
+
+def is_score(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and 0 <= value <= 100
+
+def validate(supplier_risks, location_risks, alternatives):
+    """Schema errors and cross-reference warnings, as two lists of messages"""
+
+    errors, warnings = [], []
+
+    if not isinstance(supplier_risks, dict):
+        errors.append("supplier_risks.json: expected an object of supplier -> {risk_score, reason}")
+        supplier_risks = {}
+    if not isinstance(location_risks, dict):
+        errors.append("location_risks.json: expected an object of location -> score")
+        location_risks = {}
+    if not isinstance(alternatives, dict):
+        errors.append("alternatives.json: expected an object of component -> list of suppliers")
+        alternatives = {}
+
+    # Schemas
+    for name, entry in supplier_risks.items():
+        where = f"supplier_risks.json: {name}"
+        if not isinstance(entry, dict):
+            errors.append(f"{where}: expected an object")
+            continue
+        if not is_score(entry.get('risk_score')):
+            errors.append(f"{where}: risk_score must be a number from 0 to 100, got {entry.get('risk_score')!r}")
+        if not isinstance(entry.get('reason'), str) or not entry['reason'].strip():
+            errors.append(f"{where}: reason is missing")
+        for key in set(entry) - {'risk_score', 'reason'}:
+            warnings.append(f"{where}: unknown field '{key}'")
+
+    for location, score in location_risks.items():
+        if not is_score(score):
+            errors.append(f"location_risks.json: {location}: score must be a number from 0 to 100, got {score!r}")
+
+    for component, entries in alternatives.items():
+        if not isinstance(entries, list):
+            errors.append(f"alternatives.json: {component}: expected a list")
+            continue
+        for index, entry in enumerate(entries):
+            where = f"alternatives.json: {component}[{index}]"
+            if not isinstance(entry, dict):
+                errors.append(f"{where}: expected an object")
+                continue
+            for key in ('name', 'location', 'capacity', 'lead_time'):
+                if not isinstance(entry.get(key), str) or not entry[key].strip():
+                    errors.append(f"{where}: {key} is missing")
+            if isinstance(entry.get('capacity'), str) and entry['capacity'] not in CAPACITY_LEVELS:
+                warnings.append(f"{where}: capacity is usually one of {', '.join(CAPACITY_LEVELS)}, got {entry['capacity']!r}")
+            if isinstance(entry.get('lead_time'), str) and parse_lead_time(entry['lead_time']) is None:
+                errors.append(f"{where}: lead_time must look like '8-12 weeks', got {entry['lead_time']!r}")
+
+    # Cross references
+    by_normalized = {}
+    for name in supplier_risks:
+        normalized = normalize_name(name)
+        if normalized in by_normalized:
+            warnings.append(f"supplier_risks.json: '{name}' and '{by_normalized[normalized]}' normalize to the same name")
+        by_normalized.setdefault(normalized, name)
+
+    for component, entries in alternatives.items():
+        if not isinstance(entries, list):
+            continue
+        seen = set()
+        for entry in entries:
+            if not isinstance(entry, dict) or not isinstance(entry.get('name'), str):
+                continue
+            name = entry['name']
+            if normalize_name(name) in seen:
+                warnings.append(f"alternatives.json: {component}: '{name}' is listed twice")
+            seen.add(normalize_name(name))
+
+            if name not in supplier_risks:
+                match = by_normalized.get(normalize_name(name))
+                hint = f" (did you mean '{match}'?)" if match else "; analyze_supplier_risk will score it as 50"
+                warnings.append(f"alternatives.json: {component}: '{name}' is not in supplier_risks.json{hint}")
+
+            for location in split_locations(entry.get('location') or ''):
+                if location not in location_risks and location not in FOOTPRINT_LOCATIONS:
+                    warnings.append(f"alternatives.json: {component}: location '{location}' of '{name}' is not in location_risks.json")
+
+    return errors, warnings
+
+def compile_bundle(supplier_risks, location_risks, alternatives):
+    """The sources with derived fields, versioned by their content hash"""
+
+    compiled_alternatives = {}
+    listings = {}
+    for component, entries in alternatives.items():
+        compiled_alternatives[component] = []
+        for entry in entries:
+            locations = split_locations(entry['location'])
+            compiled_alternatives[component].append(dict(
+                entry,
+                normalized_name=normalize_name(entry['name']),
+                locations=locations,
+                lead_time_weeks=parse_lead_time(entry['lead_time'])
+            ))
+            listings.setdefault(entry['name'], []).append((component, entry['location'], locations))
+
+    suppliers = {}
+    for name, entry in supplier_risks.items():
+        supplier_listings = listings.get(name, [])
+        suppliers[name] = {
+            'risk_score': entry['risk_score'],
+            'reason': entry['reason'],
+            'normalized_name': normalize_name(name),
+            # First listing, as shown on the dashboards
+            'location': supplier_listings[0][1] if supplier_listings else 'Unknown',
+            'locations': list(dict.fromkeys(part for _, _, parts in supplier_listings for part in parts)),
+            'components': list(dict.fromkeys(component for component, _, _ in supplier_listings))
+        }
+
+    # Normalized name -> canonical name; scored suppliers win over catalog-only ones
+    name_index = {normalize_name(name): name for name in listings}
+    name_index.update({normalize_name(name): name for name in supplier_risks})
+
+    return {
+        'version': dataset_version(supplier_risks, location_risks, alternatives),
+        'generated_at': datetime.now().isoformat(),
+        'suppliers': suppliers,
+        'locations': location_risks,
+        'alternatives': compiled_alternatives,
+        'name_index': name_index
+    }
+
+def publish_bundle(bundle, body):
+    """Upload the bundle to S3, both as the live key and as a versioned copy"""
+
+    s3 = boto3.client('s3')
+    base, ext = os.path.splitext(DATASET_BUNDLE_KEY)
+    for key in (f"{base}-{bundle['version']}{ext}", DATASET_BUNDLE_KEY):
+        s3.put_object(Bucket=S3_BUCKET, Key=key, Body=body, ContentType='application/json')
+        print(f"Uploaded s3://{S3_BUCKET}/{key}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate the source datasets and compile the dataset bundle")
+    parser.add_argument('--data-dir', default=os.path.dirname(os.path.abspath(__file__)),
+                        help="Directory holding the source JSON files")
+    parser.add_argument('--strict', action='store_true',
+                        help="Treat cross-reference warnings as errors")
+    parser.add_argument('--upload', action='store_true',
+                        help="Publish the bundle to the S3 data bucket")
+    args = parser.parse_args()
+
+    supplier_risks, location_risks, alternatives = load_sources(args.data_dir)
+    errors, warnings = validate(supplier_risks, location_risks, alternatives)
+
+    for message in warnings:
+        print(f"warning: {message}")
+    for message in errors:
+        print(f"error: {message}")
+
+    if errors or (args.strict and warnings):
+        print(f"Not compiled: {len(errors)} errors, {len(warnings)} warnings")
+        sys.exit(1)
+
+    bundle = compile_bundle(supplier_risks, location_risks, alternatives)
+    body = json.dumps(bundle, separators=(',', ':'))
+
+    output_path = os.path.join(args.data_dir, os.path.basename(DATASET_BUNDLE_KEY))
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(body)
+
+    print(f"Dataset bundle {bundle['version']}: {len(bundle['suppliers'])} suppliers, "
+          f"{len(bundle['locations'])} locations, {len(bundle['alternatives'])} components, "
+          f"{len(warnings)} warnings -> {output_path}")
+
+    if args.upload:
+        publish_bundle(bundle, body)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+"""
+Supply Chain Crisis Manager - Live crisis feed
+Tails a directory of JSON crisis events (and an in-process queue standing in
+for SNS/Kinesis), maps each event to the suppliers it reaches and keeps live
+risk scores. Applying an event only touches those suppliers, so its cost
+follows the event's reach rather than the size of the catalog.
+
+An event looks like
+    {"id": "tw-quake-1", "crisis_type": "earthquake", "location": "Taiwan",
+     "severity": "High", "suppliers": ["TSMC"]}
+and {"id": "tw-quake-1", "status": "resolved"} takes it back out.
+"""
+
+import json
+import os
+import queue
+import threading
+from collections import deque
+from datetime import datetime
+
+import numpy as np
+
+from lambda1 import CRISIS_MULTIPLIERS, SEVERITY_MULTIPLIERS
+from supplier_data import DATA_DIR, supplier_frame
+
+CRISIS_FEED_DIR = os.getenv('CRISIS_FEED_DIR', os.path.join(DATA_DIR, 'crisis_events'))
+
+# Risk points a Medium crisis of an unlisted type adds to each supplier it reaches
+CRISIS_BASE_UPLIFT = int(os.getenv('CRISIS_BASE_UPLIFT', '15'))
+
+# Score changes kept for sessions catching up on deltas
+CRISIS_FEED_HISTORY = int(os.getenv('CRISIS_FEED_HISTORY', '1000'))
+
+
+def event_uplift(event: dict) -> int:
+    """Risk points an event adds, scaled like calculate_crisis_impact"""
+
+    multiplier = CRISIS_MULTIPLIERS.get(str(event.get('crisis_type', '')).lower(), 1.0)
+    severity = str(event.get('severity', 'Medium')).title()
+    return int(CRISIS_BASE_UPLIFT * multiplier * SEVERITY_MULTIPLIERS.get(severity, 1.0))
+
+
+def event_problem(event) -> str:
+    """Why an event can't be applied, or None when it can"""
+
+    if not isinstance(event, dict):
+        return f"expected an object, got {type(event).__name__}"
+    if not isinstance(event.get('suppliers', []), list) or \
+            not all(isinstance(name, str) for name in event.get('suppliers', [])):
+        return "suppliers must be a list of names"
+    return None
+
+
+class CrisisFeed:
+    """Active crises and live supplier risk, updated one event at a time"""
+
+    def __init__(self, event_dir: str = CRISIS_FEED_DIR):
+        self.event_dir = event_dir
+        self.events = queue.SimpleQueue()
+        self.active = {}
+        self.version = 0
+        self.frame = None
+        self._seen_files = set()
+        self._changes = deque(maxlen=CRISIS_FEED_HISTORY)
+        self._history_start = 0
+        self._lock = threading.Lock()
+
+    def publish(self, event: dict):
+        """Queue an event from inside the process"""
+        self.events.put(event)
+
+    def _load_catalog(self, frame):
+        """Index the supplier table and re-apply the active crises to it"""
+
+        self.frame = frame
+        self.names = list(frame['name'])
+        self.positions = {name: position for position, name in enumerate(self.names)}
+        self.base = frame['risk_score'].to_numpy().astype(np.int16)
+        self.uplift = np.zeros(len(frame), dtype=np.int16)
+        self.scores = self.base.copy()
+        self.high_risk = int((self.scores > 70).sum())
+
+        # Multi-location suppliers ("Taiwan/India") are reached from each location
+        self.by_location = {}
+        for position, location in enumerate(frame['location']):
+            for part in str(location).split('/'):
+                self.by_location.setdefault(part.strip().lower(), []).append(position)
+
+        # Sessions holding deltas from the old table have to start over
+        self._changes.clear()
+        self.version += 1
+        self._history_start = self.version
+
+        for crisis in self.active.values():
+            crisis['positions'] = self._reach(crisis['event'])
+            self._shift(crisis['positions'], crisis['uplift'])
+
+    def _reach(self, event: dict) -> list:
+        positions = set(self.by_location.get(str(event.get('location', '')).strip().lower(), []))
+        positions.update(self.positions[name] for name in event.get('suppliers', []) if name in self.positions)
+        return sorted(positions)
+
+    def _shift(self, positions: list, points: int):
+        """Add points of uplift to the given suppliers and log what changed"""
+
+        if not positions:
+            return
+
+        positions = np.asarray(positions)
+        before = self.scores[positions].copy()
+        self.uplift[positions] += points
+        after = np.minimum(100, self.base[positions] + self.uplift[positions]).astype(np.int16)
+        self.scores[positions] = after
+        self.high_risk += int((after > 70).sum()) - int((before > 70).sum())
+
+        self.version += 1
+        for position, old, new in zip(positions.tolist(), before.tolist(), after.tolist()):
+            if old != new:
+                # Sessions that haven't seen the entry about to drop out must start over
+                if len(self._changes) == self._changes.maxlen:
+                    self._history_start = self._changes[0][0]
+                self._changes.append((self.version, position, old, new))
+
+    def apply(self, event: dict):
+        """Start, update or resolve the crisis an event describes"""
+
+        crisis_id = str(event.get('id') or f"{event.get('crisis_type', 'crisis')}-{event.get('location', 'unknown')}")
+
+        # An update replaces the crisis: take the old uplift back out first
+        previous = self.active.pop(crisis_id, None)
+        if previous is not None:
+            self._shift(previous['positions'], -previous['uplift'])
+
+        if str(event.get('status', 'active')).lower() == 'resolved':
+            return
+
+        crisis = {
+            'event': event,
+            'positions': self._reach(event),
+            'uplift': event_uplift(event),
+            'received_at': previous['received_at'] if previous else datetime.now()
+        }
+        self._shift(crisis['positions'], crisis['uplift'])
+        self.active[crisis_id] = crisis
+
+    def _new_file_events(self) -> list:
+        try:
+            entries = sorted(
+                (entry for entry in os.scandir(self.event_dir) if entry.name.endswith('.json') and entry.is_file()),
+                key=lambda entry: (entry.stat().st_mtime, entry.name)
+            )
+        except FileNotFoundError:
+            return []
+
+        events = []
+        for entry in entries:
+            if entry.name in self._seen_files:
+                continue
+            try:
+                with open(entry.path, encoding='utf-8') as f:
+                    loaded = json.load(f)
+            except ValueError:
+                # Probably still being written; try again on the next poll
+                continue
+
+            for index, event in enumerate(loaded if isinstance(loaded, list) else [loaded]):
+                problem = event_problem(event)
+                if problem is not None:
+                    print(f"Skipping crisis event {index} in {entry.name}: {problem}")
+                    continue
+                events.append(dict(event, id=event.get('id') or os.path.splitext(entry.name)[0]))
+
+            # Only a file that parsed is done with
+            self._seen_files.add(entry.name)
+        return events
+
+    def poll(self) -> int:
+        """Apply events that arrived since the last poll; returns how many"""
+
+        with self._lock:
+            frame = supplier_frame()
+            if frame is not self.frame:
+                self._load_catalog(frame)
+
+            events = self._new_file_events()
+            while True:
+                try:
+                    event = self.events.get_nowait()
+                except queue.Empty:
+                    break
+                problem = event_problem(event)
+                if problem is not None:
+                    print(f"Skipping published crisis event: {problem}")
+                    continue
+                events.append(event)
+
+            for event in events:
+                self.apply(event)
+            return len(events)
+
+    def changes_since(self, version: int):
+        """Suppliers whose live score changed after version
+
+        Returns [{'name', 'location', 'risk_before', 'risk_score'}], or None
+        when those changes are no longer all in the history.
+        """
+
+        with self._lock:
+            if version < self._history_start:
+                return None
+
+            changed = {}
+            for change_version, position, old, new in self._changes:
+                if change_version > version:
+                    first = changed.get(position, (old, new))[0]
+                    changed[position] = (first, new)
+
+            return [
+                {
+                    'name': self.names[position],
+                    'location': self.frame['location'].iat[position],
+                    'risk_before': old,
+                    'risk_score': new
+                }
+                for position, (old, new) in changed.items() if old != new
+            ]
+
+    def raised_scores(self) -> list:
+        """Every supplier whose live score is above its base, for a full refresh"""
+
+        with self._lock:
+            if self.frame is None:
+                return []
+            return [
+                {
+                    'name': self.names[position],
+                    'location': self.frame['location'].iat[position],
+                    'base_risk': int(self.base[position]),
+                    'risk_score': int(self.scores[position])
+                }
+                for position in np.flatnonzero(self.scores != self.base).tolist()
+            ]
+
+    def summary(self) -> dict:
+        """Counts and active crises for the monitoring panel"""
+
+        with self._lock:
+            return {
+                'version': self.version,
+                'suppliers': len(self.names) if self.frame is not None else 0,
+                'high_risk': self.high_risk if self.frame is not None else 0,
+                'affected': int((self.uplift > 0).sum()) if self.frame is not None else 0,
+                'crises': [
+                    {
+                        'id': crisis_id,
+                        'crisis_type': crisis['event'].get('crisis_type', 'Unknown'),
+                        'location': crisis['event'].get('location', 'Unknown'),
+                        'severity': crisis['event'].get('severity', 'Medium'),
+                        'suppliers': len(crisis['positions']),
+                        'since': crisis['received_at'].strftime('%H:%M:%S')
+                    }
+                    for crisis_id, crisis in self.active.items()
+                ]
+            }
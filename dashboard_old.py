@@ -5,6 +5,7 @@ Save as dashboard/app.py
 """
 
 import streamlit as st
+import streamlit.components.v1 as components
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
@@ -17,9 +18,27 @@ from typing import Dict, List
 import os
 from dotenv import load_dotenv
 
+from crisis_feed import CrisisFeed
+from response_cache import cached_answer, get_prompt_warmer, remember_answer
+from supplier_data import current_dataset_version, supplier_index
+from supply_chain_agent import AGENT_BACKEND, SCENARIO_PROMPTS, get_local_agent_runtime
+
 # Load environment variables
 load_dotenv()
 
+# Seconds between monitoring refreshes when auto-refresh is on
+AUTO_REFRESH_SECONDS = int(os.getenv('AUTO_REFRESH_SECONDS', '30'))
+
+# Reports whether the browser tab is hidden (see tab_visibility/index.html)
+tab_visibility = components.declare_component(
+    "tab_visibility",
+    path=os.path.join(os.path.dirname(os.path.abspath(__file__)), "tab_visibility")
+)
+
+# Rows per page of the supplier table, and suppliers on its risk chart
+SUPPLIER_PAGE_SIZE = int(os.getenv('SUPPLIER_PAGE_SIZE', '25'))
+SUPPLIER_CHART_TOP_N = int(os.getenv('SUPPLIER_CHART_TOP_N', '30'))
+
 # Configure Streamlit page
 st.set_page_config(
     page_title="Supply Chain Crisis Manager", 
@@ -71,10 +90,14 @@ class SupplyChainAgent:
         self.agent_alias_id = os.getenv('BEDROCK_AGENT_ALIAS_ID', 'TSTALIASID')
         
         try:
-            self.bedrock_agent_runtime = boto3.client(
-                'bedrock-agent-runtime', 
-                region_name=os.getenv('AWS_REGION', 'us-east-1')
-            )
+            if self.agent_id == 'YOUR_AGENT_ID_HERE' or AGENT_BACKEND == 'local':
+                # Demo: local stand-in running the real tool functions on the bundled data
+                self.bedrock_agent_runtime = get_local_agent_runtime()
+            else:
+                self.bedrock_agent_runtime = boto3.client(
+                    'bedrock-agent-runtime', 
+                    region_name=os.getenv('AWS_REGION', 'us-east-1')
+                )
             self.connected = True
         except Exception as e:
             st.error(f"Failed to connect to Bedrock Agent: {e}")
@@ -86,10 +109,6 @@ class SupplyChainAgent:
         if not self.connected:
             return {"error": "Agent not connected"}
         
-        if self.agent_id == 'YOUR_AGENT_ID_HERE':
-            # Fallback to mock data for demo
-            return self._mock_agent_response(prompt)
-        
         try:
             session_id = f"dashboard-{int(time.time())}"
             
@@ -113,30 +132,6 @@ class SupplyChainAgent:
             
         except Exception as e:
             return {"error": str(e), "success": False}
-    
-    def _mock_agent_response(self, prompt: str) -> Dict:
-        """Mock response for demo when agent ID not configured"""
-        
-        mock_responses = {
-            "TSMC": {
-                "response": "Based on my analysis of TSMC in Taiwan:\n\n**Risk Assessment: HIGH (85/100)**\n\n**Risk Factors:**\n- Geographic concentration in Taiwan (earthquake risk)\n- Single point of failure for global semiconductor supply\n- Geopolitical tensions affecting operations\n\n**Recommendations:**\n1. Immediate alternative sourcing from Samsung (South Korea)\n2. Increase inventory buffer by 40%\n3. Activate emergency procurement protocols\n4. Consider long-term supplier diversification",
-                "success": True
-            },
-            "earthquake": {
-                "response": "**CRISIS IMPACT ANALYSIS: Taiwan Earthquake**\n\n**Severity Assessment: CRITICAL**\n\n**Impact Projections:**\n- Production Delay: 22 days\n- Cost Increase: 25%\n- Revenue at Risk: 40%\n- Recovery Time: 5-6 weeks\n\n**Affected Components:**\n- Semiconductors (85% impact)\n- Memory chips (60% impact)\n- Assembly operations (45% impact)\n\n**Immediate Actions Required:**\n1. Switch to Samsung for critical semiconductors\n2. Activate air freight for urgent components\n3. Implement emergency inventory protocols\n4. Notify customers of potential delays",
-                "success": True
-            }
-        }
-        
-        # Simple keyword matching for demo
-        for keyword, response in mock_responses.items():
-            if keyword.lower() in prompt.lower():
-                return response
-        
-        return {
-            "response": "I'm analyzing the supply chain situation. This is a demo response showing the agent's capabilities for risk assessment and procurement recommendations.",
-            "success": True
-        }
 
 # Initialize components
 @st.cache_resource
@@ -144,18 +139,6 @@ def init_agent():
     """Initialize the agent (cached for performance)"""
     return SupplyChainAgent()
 
-@st.cache_data(ttl=300)  # Cache for 5 minutes
-def get_sample_supplier_data():
-    """Generate sample supplier data"""
-    return pd.DataFrame([
-        {"name": "TSMC", "location": "Taiwan", "component": "Semiconductors", "risk_score": 85, "status": "High Risk", "backup_available": False},
-        {"name": "Samsung", "location": "South Korea", "component": "Memory Chips", "risk_score": 45, "status": "Medium Risk", "backup_available": True},
-        {"name": "Foxconn", "location": "China", "component": "Assembly", "risk_score": 60, "status": "Medium Risk", "backup_available": True},
-        {"name": "Intel", "location": "USA", "component": "Processors", "risk_score": 25, "status": "Low Risk", "backup_available": True},
-        {"name": "Sony", "location": "Japan", "component": "Camera Sensors", "risk_score": 35, "status": "Low Risk", "backup_available": False},
-        {"name": "Micron", "location": "USA", "component": "Storage", "risk_score": 30, "status": "Low Risk", "backup_available": True},
-    ])
-
 def display_main_header():
     """Display the main dashboard header"""
     
@@ -172,20 +155,62 @@ def display_real_time_monitoring():
     
     st.header("🔍 Real-Time Crisis Monitoring")
     
+    # Only this section reruns on the timer. Hiding or showing the tab
+    # reruns the page, which stops the timer until the tab is visible again.
+    auto_refresh = st.session_state.get("auto_refresh", False)
+    tab_hidden = auto_refresh and tab_visibility(key="tab_hidden", default=False)
+    run_every = AUTO_REFRESH_SECONDS if auto_refresh and not tab_hidden else None
+    st.fragment(run_every=run_every)(display_monitoring_metrics)()
+
+@st.cache_resource
+def get_crisis_feed():
+    """Crisis feed shared by every session in this process"""
+    return CrisisFeed()
+
+def display_monitoring_metrics():
+    """Live crisis metrics and the supplier scores that changed since the last refresh"""
+    
+    # Apply the crisis events that arrived since any session last looked
+    feed = get_crisis_feed()
+    feed.poll()
+    summary = feed.summary()
+    previous = st.session_state.get('monitoring_summary', summary)
+    
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("Active Suppliers", "6", delta="0")
+        st.metric("Active Suppliers", summary['suppliers'], delta=f"{summary['suppliers'] - previous['suppliers']:+d}")
     
     with col2:
-        high_risk = len(get_sample_supplier_data()[get_sample_supplier_data()['risk_score'] > 70])
-        st.metric("High Risk Suppliers", high_risk, delta="+1", delta_color="inverse")
+        st.metric("High Risk Suppliers", summary['high_risk'], delta=f"{summary['high_risk'] - previous['high_risk']:+d}", delta_color="inverse")
     
     with col3:
-        st.metric("Active Crises", "1", delta="0", delta_color="inverse")
+        st.metric("Active Crises", len(summary['crises']), delta=f"{len(summary['crises']) - len(previous['crises']):+d}", delta_color="inverse")
     
     with col4:
-        st.metric("Mitigation Actions", "12", delta="+4")
+        st.metric("Suppliers Affected", summary['affected'], delta=f"{summary['affected'] - previous['affected']:+d}", delta_color="inverse")
+    
+    if summary['crises']:
+        st.markdown("**Active crises**")
+        st.dataframe(pd.DataFrame(summary['crises']), use_container_width=True, hide_index=True)
+    
+    # Only the scores that moved since this session's last refresh
+    changes = feed.changes_since(previous['version'])
+    if changes is None:
+        # The history no longer reaches back that far (or the catalog was
+        # reloaded): show every raised score instead of a delta
+        raised = feed.raised_scores()
+        st.markdown("**Raised scores (full refresh)**")
+        if raised:
+            st.dataframe(pd.DataFrame(raised), use_container_width=True, hide_index=True)
+        else:
+            st.caption("No supplier is currently above its base risk score.")
+    elif changes:
+        st.markdown("**Changed since last refresh**")
+        st.dataframe(pd.DataFrame(changes), use_container_width=True, hide_index=True)
+    
+    st.session_state['monitoring_summary'] = summary
+    st.caption(f"Last refreshed {datetime.now().strftime('%H:%M:%S')}")
 
 def display_crisis_simulation():
     """Display crisis simulation and agent interaction"""
@@ -214,22 +239,20 @@ def display_crisis_simulation():
             )
             analysis_prompt = custom_prompt
         else:
-            # Pre-defined prompts for scenarios
-            scenario_prompts = {
-                "Taiwan Earthquake (7.2 magnitude affecting TSMC)": 
-                    "A 7.2 magnitude earthquake has hit Taiwan affecting TSMC semiconductor facilities. Calculate the crisis impact and provide procurement recommendations with critical urgency.",
-                "Shanghai Port Congestion (14-day delays)": 
-                    "Shanghai port is experiencing 14-day shipping delays affecting Foxconn assembly operations. Analyze the impact and find alternative suppliers for assembly services.",
-                "South Korea Manufacturing Strike": 
-                    "Manufacturing strikes in South Korea are affecting Samsung memory chip production. Assess the risk and generate procurement recommendations."
-            }
-            analysis_prompt = scenario_prompts.get(scenario, "Analyze current supply chain risks")
+            # Pre-defined prompts for scenarios (pre-warmed in the background)
+            analysis_prompt = SCENARIO_PROMPTS.get(scenario, "Analyze current supply chain risks")
         
         if st.button("🚀 Run AI Analysis", type="primary"):
             if analysis_prompt:
                 with st.spinner("🤖 AI Agent is analyzing the situation..."):
-                    agent = init_agent()
-                    result = agent.invoke_agent(analysis_prompt)
+                    cached = cached_answer(analysis_prompt)
+                    if cached is not None:
+                        result = {"response": cached["response"], "success": True, "cached_at": cached["cached_at"]}
+                    else:
+                        agent = init_agent()
+                        result = agent.invoke_agent(analysis_prompt)
+                        if result.get("success", False) and agent.agent_id != 'YOUR_AGENT_ID_HERE':
+                            remember_answer(analysis_prompt, result["response"])
                     
                     if result.get("success", False):
                         st.markdown("""
@@ -238,6 +261,9 @@ def display_crisis_simulation():
                         </div>
                         """, unsafe_allow_html=True)
                         
+                        if result.get("cached_at"):
+                            st.caption(f"Cached at {result['cached_at'].strftime('%H:%M:%S')}")
+                        
                         st.markdown("**Agent Response:**")
                         st.markdown(result["response"])
                         
@@ -259,7 +285,7 @@ def display_crisis_simulation():
                 st.success("✅ Connected to Bedrock Agent")
                 st.info(f"Agent ID: {agent.agent_id[:10]}...")
             else:
-                st.warning("⚠️ Demo Mode (Update BEDROCK_AGENT_ID)")
+                st.warning("⚠️ Demo Mode: local agent (Update BEDROCK_AGENT_ID)")
         else:
             st.error("❌ Agent Connection Failed")
         
@@ -273,44 +299,65 @@ def display_crisis_simulation():
             preview = analysis['response'][:200] + "..." if len(analysis['response']) > 200 else analysis['response']
             st.text_area("Response Preview:", preview, height=100, disabled=True)
 
+@st.cache_data(max_entries=4)
+def supplier_overview_figures(dataset_version):
+    """Top-risk bar chart and location pie for one dataset version, as figure specs"""
+    
+    index = supplier_index()
+    suppliers = index.frame
+    
+    # The riskiest suppliers rather than the whole catalog
+    top = suppliers.iloc[index.by_risk[::-1][:SUPPLIER_CHART_TOP_N]]
+    fig = px.bar(
+        top,
+        x='name',
+        y='risk_score',
+        color='risk_score',
+        color_continuous_scale=['green', 'yellow', 'red'],
+        title="Supplier Risk Scores" if len(top) == len(suppliers) else f"Top {len(top)} Supplier Risk Scores",
+        labels={'risk_score': 'Risk Score (0-100)', 'name': 'Supplier'},
+        text='risk_score'
+    )
+    fig.update_layout(height=400, showlegend=False)
+    fig.update_traces(texttemplate='%{text}', textposition='outside')
+    
+    # Geographic distribution
+    location_counts = suppliers['location'].value_counts()
+    fig_pie = px.pie(
+        values=location_counts.values,
+        names=location_counts.index,
+        title="Geographic Distribution",
+        color_discrete_sequence=px.colors.qualitative.Set3
+    )
+    
+    return fig.to_dict(), fig_pie.to_dict()
+
 def display_supplier_dashboard():
     """Display supplier risk dashboard"""
     
     st.header("📊 Supplier Risk Dashboard")
     
-    suppliers = get_sample_supplier_data()
+    bar_figure, pie_figure = supplier_overview_figures(current_dataset_version())
     
     col1, col2 = st.columns([2, 1])
     
     with col1:
         # Risk score visualization
-        fig = px.bar(
-            suppliers,
-            x='name',
-            y='risk_score',
-            color='risk_score',
-            color_continuous_scale=['green', 'yellow', 'red'],
-            title="Supplier Risk Scores",
-            labels={'risk_score': 'Risk Score (0-100)', 'name': 'Supplier'},
-            text='risk_score'
-        )
-        fig.update_layout(height=400, showlegend=False)
-        fig.update_traces(texttemplate='%{text}', textposition='outside')
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(bar_figure, use_container_width=True)
     
     with col2:
-        # Geographic distribution
-        location_counts = suppliers['location'].value_counts()
-        fig_pie = px.pie(
-            values=location_counts.values,
-            names=location_counts.index,
-            title="Geographic Distribution",
-            color_discrete_sequence=px.colors.qualitative.Set3
-        )
-        st.plotly_chart(fig_pie, use_container_width=True)
+        st.plotly_chart(pie_figure, use_container_width=True)
     
     # Detailed supplier table
     st.subheader("Detailed Supplier Information")
+    display_supplier_table()
+
+@st.fragment
+def display_supplier_table():
+    """Filters and the current page of the supplier table (reruns on its own)"""
+    
+    index = supplier_index()
+    suppliers = index.frame
     
     # Add filtering
     col1, col2, col3 = st.columns(3)
@@ -318,8 +365,8 @@ def display_supplier_dashboard():
     with col1:
         location_filter = st.multiselect(
             "Filter by Location:",
-            suppliers['location'].unique(),
-            default=suppliers['location'].unique()
+            suppliers['location'].cat.categories,
+            default=suppliers['location'].cat.categories
         )
     
     with col2:
@@ -334,20 +381,18 @@ def display_supplier_dashboard():
             ["All", "Yes", "No"]
         )
     
-    # Apply filters
-    filtered_suppliers = suppliers[suppliers['location'].isin(location_filter)]
-    
-    if risk_filter != "All":
-        if risk_filter == "High Risk (>70)":
-            filtered_suppliers = filtered_suppliers[filtered_suppliers['risk_score'] > 70]
-        elif risk_filter == "Medium Risk (40-70)":
-            filtered_suppliers = filtered_suppliers[(filtered_suppliers['risk_score'] >= 40) & (filtered_suppliers['risk_score'] <= 70)]
-        else:  # Low Risk
-            filtered_suppliers = filtered_suppliers[filtered_suppliers['risk_score'] < 40]
+    # Apply filters on the precomputed indexes, highest risk first
+    rows = index.filter(
+        location_filter,
+        band=None if risk_filter == "All" else risk_filter.split(" (")[0],
+        backup=None if backup_filter == "All" else backup_filter == "Yes"
+    )
     
-    if backup_filter != "All":
-        backup_bool = backup_filter == "Yes"
-        filtered_suppliers = filtered_suppliers[filtered_suppliers['backup_available'] == backup_bool]
+    # Only the visible page is built, styled and sent to the browser
+    page_count = max(1, -(-len(rows) // SUPPLIER_PAGE_SIZE))
+    page = st.number_input("Page", min_value=1, max_value=page_count, value=1) if page_count > 1 else 1
+    start = (page - 1) * SUPPLIER_PAGE_SIZE
+    page_rows = rows[start:start + SUPPLIER_PAGE_SIZE]
     
     # Style the dataframe
     def color_risk_score(val):
@@ -358,20 +403,18 @@ def display_supplier_dashboard():
         else:
             return 'background-color: #e8f5e8'
     
-    styled_df = filtered_suppliers.style.applymap(color_risk_score, subset=['risk_score'])
+    table_columns = ['name', 'location', 'component', 'risk_score', 'status', 'backup_available']
+    styled_df = suppliers.iloc[page_rows][table_columns].style.map(color_risk_score, subset=['risk_score'])
     st.dataframe(styled_df, use_container_width=True, hide_index=True)
+    st.caption(f"Showing {start + 1 if len(page_rows) else 0}–{start + len(page_rows)} of {len(rows)} suppliers")
 
 def display_sidebar():
     """Display sidebar with controls and settings"""
     
     st.sidebar.header("⚙️ Dashboard Controls")
     
-    # Auto-refresh toggle
-    auto_refresh = st.sidebar.checkbox("🔄 Auto-refresh (30s)")
-    
-    if auto_refresh:
-        time.sleep(30)
-        st.rerun()
+    # Auto-refresh toggle (refreshes only the monitoring section)
+    st.sidebar.checkbox(f"🔄 Auto-refresh ({AUTO_REFRESH_SECONDS}s)", key="auto_refresh")
     
     # Agent configuration
     st.sidebar.header("🤖 Agent Configuration")
@@ -384,6 +427,7 @@ def display_sidebar():
         st.sidebar.info("Set BEDROCK_AGENT_ID environment variable to use your real agent")
     else:
         st.sidebar.success("✅ Agent Connected")
+        st.sidebar.text(get_prompt_warmer().summary())
     
     # Quick actions
     st.sidebar.header("⚡ Quick Actions")
@@ -403,6 +447,9 @@ def display_sidebar():
 def main():
     """Main dashboard application"""
     
+    # Answer the canned scenarios in the background
+    get_prompt_warmer().ensure_warm()
+    
     # Display components
     display_main_header()
     display_real_time_monitoring()
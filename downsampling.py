@@ -0,0 +1,63 @@
+"""
+Supply Chain Crisis Manager - Chart downsampling
+Shrinks long time series to a point budget before they are charted, keeping
+their visual shape (Largest-Triangle-Three-Buckets), so chart payloads stay
+the same size however much history there is
+"""
+
+import os
+
+import numpy as np
+
+# Points per trace sent to the browser; about one per pixel of chart width
+CHART_POINT_BUDGET = int(os.getenv('CHART_POINT_BUDGET', '500'))
+
+
+def window(x: np.ndarray, y: np.ndarray, start=None, end=None) -> tuple:
+    """The part of a series (sorted by x) with start <= x <= end"""
+
+    low = 0 if start is None else np.searchsorted(x, start, side='left')
+    high = len(x) if end is None else np.searchsorted(x, end, side='right')
+    return x[low:high], y[low:high]
+
+
+def lttb(x: np.ndarray, y: np.ndarray, budget: int = CHART_POINT_BUDGET) -> np.ndarray:
+    """Indices of the points Largest-Triangle-Three-Buckets keeps
+
+    The first and last points are always kept; the rest are split into
+    budget - 2 buckets, each keeping the point that forms the largest
+    triangle with the previous pick and the next bucket's average.
+    """
+
+    size = len(x)
+    if budget >= size or budget < 3:
+        return np.arange(size)
+
+    # Dates become nanoseconds so areas can be computed
+    xs = np.asarray(x).astype(np.float64)
+    ys = np.asarray(y, dtype=np.float64)
+
+    edges = np.linspace(1, size - 1, budget - 1).astype(np.int64)
+    kept = np.empty(budget, dtype=np.int64)
+    kept[0], kept[-1] = 0, size - 1
+
+    previous = 0
+    for bucket in range(budget - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        if bucket + 2 < len(edges):
+            next_start, next_stop = edges[bucket + 1], edges[bucket + 2]
+        else:
+            next_start, next_stop = size - 1, size
+
+        next_x = xs[next_start:next_stop].mean()
+        next_y = ys[next_start:next_stop].mean()
+
+        # Twice the triangle area; the constant factor doesn't change the pick
+        areas = np.abs(
+            (xs[previous] - next_x) * (ys[start:stop] - ys[previous])
+            - (xs[previous] - xs[start:stop]) * (next_y - ys[previous])
+        )
+        previous = start + int(areas.argmax())
+        kept[bucket + 1] = previous
+
+    return kept
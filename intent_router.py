@@ -0,0 +1,134 @@
+"""
+Supply Chain Crisis Manager - Fast path for structured questions
+Recognizes templated questions ("What's the risk level for Samsung in South
+Korea?", "Find alternative semiconductor suppliers for TSMC") and answers them
+by calling the tool functions directly, without the agent's model turns.
+Anything that doesn't match a template exactly is left to the agent.
+"""
+
+import os
+import re
+import threading
+
+from local_agent import ToolCatalog, format_tool_result, run_tool
+
+FAST_PATH_ENABLED = os.getenv('FAST_PATH_ENABLED', 'true').lower() == 'true'
+
+SUPPLIER = r"(?P<supplier>[\w&+ .-]+?)"
+COMPONENT = r"(?P<component>[\w ]+?)"
+LOCATION = r"(?P<location>[\w ]+?)"
+ASK = r"(?:find|show|list|get|give)(?: me)?"
+
+# (function, pattern); a pattern must match the whole normalized question
+TEMPLATES = [
+    ('analyze_supplier_risk', re.compile(
+        r"(?:what(?:'s| is) the |analy[sz]e (?:the )?|assess (?:the )?|check (?:the )?|show (?:me )?(?:the )?)?"
+        r"risk(?: level| score)? (?:for|of) " + SUPPLIER + r"(?: supplier)?(?: in " + LOCATION + r")?"
+    )),
+    ('find_alternative_suppliers', re.compile(
+        ASK + r" alternative " + COMPONENT + r" suppliers (?:for|to|instead of) " + SUPPLIER
+    )),
+    ('find_alternative_suppliers', re.compile(
+        ASK + r" alternative suppliers (?:for|of) " + COMPONENT +
+        r"(?: if " + SUPPLIER + r" is (?:affected|down|disrupted|unavailable))?"
+    )),
+    ('find_alternative_suppliers', re.compile(
+        ASK + r" alternatives (?:to|for) " + SUPPLIER
+    ))
+]
+
+
+def normalize_question(prompt: str) -> str:
+    return re.sub(r'\s+', ' ', prompt).strip().rstrip('.?!').lower().replace('’', "'")
+
+
+class IntentRouter:
+    """Matches questions to tool calls and keeps a process-wide hit rate"""
+
+    def __init__(self, data_dir: str = ''):
+        # Tools run in-process on the agent's data: data_dir, or S3 when ''
+        self.data_dir = data_dir
+        try:
+            self.catalog = ToolCatalog.from_datasets(data_dir)
+        except Exception as e:
+            print(f"Fast path disabled, datasets unavailable: {str(e)}")
+            self.catalog = None
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def match(self, prompt: str):
+        """(function, params) for a templated question, or None"""
+
+        if self.catalog is None:
+            return None
+
+        question = normalize_question(prompt)
+
+        for function_name, pattern in TEMPLATES:
+            found = pattern.fullmatch(question)
+            if found is None:
+                continue
+
+            fields = {name: value for name, value in found.groupdict().items() if value}
+            supplier = self.catalog.resolve_supplier(fields['supplier']) if 'supplier' in fields else None
+
+            # Every entity in the question has to be one we know
+            if 'supplier' in fields and supplier is None:
+                continue
+
+            if function_name == 'analyze_supplier_risk':
+                location = self.catalog.resolve_location(fields['location']) if 'location' in fields \
+                    else self.catalog.home_location.get(supplier)
+                # Unscored suppliers and locations would get the tool's default of 50
+                if supplier not in self.catalog.scored_suppliers or location not in self.catalog.locations:
+                    continue
+                return function_name, {'supplier_name': supplier, 'location': location}
+
+            component = self.catalog.resolve_component(fields['component']) if 'component' in fields \
+                else self.catalog.component_of.get(supplier)
+            if component is None:
+                continue
+            return function_name, {'component': component, 'affected_supplier': supplier or 'Unknown'}
+
+        return None
+
+    def answer(self, prompt: str):
+        """Answer a templated question directly
+
+        Returns {'function', 'params', 'response'}, or None when the
+        question should go to the agent.
+        """
+
+        routed = self.match(prompt)
+        result = None
+
+        if routed is not None:
+            function_name, params = routed
+            result = run_tool(function_name, params, self.data_dir)
+            # Tool errors are left for the agent to work around
+            if 'error' in result:
+                result = None
+
+        with self._lock:
+            if result is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        if result is None:
+            return None
+
+        return {
+            'function': function_name,
+            'params': params,
+            'response': format_tool_result(function_name, result)
+        }
+
+    def summary(self) -> str:
+        """One-line hit rate for the sidebar"""
+
+        total = self.hits + self.misses
+        if not total:
+            return "Fast path: no questions yet"
+        return f"Fast path: {self.hits}/{total} answered directly ({self.hits / total:.0%})"
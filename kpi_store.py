@@ -0,0 +1,228 @@
+"""
+Supply Chain Crisis Manager - Operational KPIs
+Folds the agent trace log into pre-aggregated counters and latency
+histograms in SQLite. Each refresh reads only the lines appended since the
+previous one, so a dashboard load costs the same after months of history.
+"""
+
+import json
+import os
+import sqlite3
+from bisect import bisect_left
+from collections import Counter
+from contextlib import closing
+from datetime import datetime
+
+from agent_trace import AGENT_TRACE_LOG
+
+KPI_DB = os.getenv(
+    'KPI_DB',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'kpi_state.db')
+)
+
+# Upper bounds (seconds) of the latency histogram buckets; one more bucket
+# holds everything slower
+LATENCY_BUCKETS = [0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 30, 60, 120]
+
+# Crisis types the tools know, grouped as on the dashboard; any other
+# crisis counts as a supplier issue
+CRISIS_CATEGORIES = {
+    'earthquake': 'Natural Disasters',
+    'flood': 'Natural Disasters',
+    'geopolitical': 'Geopolitical Events',
+    'port_closure': 'Port Disruptions',
+    'strike': 'Labor Strikes'
+}
+
+# Background invocations that are not user activity
+IGNORED_SESSION_PREFIXES = ('prewarm-',)
+
+
+def latency_bucket(seconds: float) -> int:
+    return bisect_left(LATENCY_BUCKETS, seconds)
+
+
+def histogram_percentile(histogram: dict, pct: float):
+    """Upper bound of the bucket holding the pct-th percentile, or None"""
+
+    total = sum(histogram.values())
+    if not total:
+        return None
+
+    seen = 0
+    for bucket in sorted(histogram, key=int):
+        seen += histogram[bucket]
+        if seen >= total * pct / 100:
+            index = int(bucket)
+            return LATENCY_BUCKETS[index] if index < len(LATENCY_BUCKETS) else float('inf')
+    return float('inf')
+
+
+def _split_suppliers(value: str) -> list:
+    return [supplier.strip() for supplier in (value or '').split(',') if supplier.strip() and supplier.strip() != 'Unknown']
+
+
+def fold_record(record: dict, counts: Counter, latest: dict) -> bool:
+    """Add one trace record to the pending counter deltas
+
+    counts is keyed by (dimension, key) and summed into the store; latest
+    holds (dimension, key) -> value kept as a running maximum.
+    """
+
+    if str(record.get('session_id', '')).startswith(IGNORED_SESSION_PREFIXES):
+        return False
+
+    started_at = datetime.fromisoformat(record['started_at'])
+    started = started_at.timestamp()
+
+    counts['total', 'invocations'] += 1
+    counts['total', 'succeeded' if record.get('success') else 'failed'] += 1
+    counts['day', started_at.date().isoformat()] += 1
+    counts['total', 'retries'] += record.get('retries') or 0
+    counts['total', 'hedged'] += 1 if record.get('hedged') else 0
+
+    if record.get('total_seconds') is not None:
+        counts['latency_total', str(latency_bucket(record['total_seconds']))] += 1
+    if record.get('time_to_first_byte') is not None:
+        counts['latency_first_byte', str(latency_bucket(record['time_to_first_byte']))] += 1
+
+    fast_path = False
+    crises = set()
+
+    for step in record.get('steps', []):
+        if step.get('type') != 'tool':
+            continue
+
+        function = step['name'].rsplit('.', 1)[-1]
+        params = step.get('params') or {}
+        fast_path = fast_path or step['name'].startswith('fast_path.')
+        counts['tool', function] += 1
+
+        if params.get('crisis_type') and params['crisis_type'] != 'Unknown':
+            crises.add(CRISIS_CATEGORIES.get(params['crisis_type'].lower(), 'Supplier Issues'))
+
+        if function == 'analyze_supplier_risk':
+            touched = [('supplier_checks', supplier) for supplier in _split_suppliers(params.get('supplier_name'))]
+        elif function == 'find_alternative_suppliers':
+            touched = [('supplier_alerts', supplier) for supplier in _split_suppliers(params.get('affected_supplier'))]
+        elif function == 'generate_procurement_recommendations':
+            touched = [('supplier_actions', supplier) for supplier in _split_suppliers(params.get('affected_suppliers'))]
+        else:
+            touched = []
+
+        for dimension, supplier in touched:
+            counts[dimension, supplier] += 1
+            latest['supplier_last_seen', supplier] = max(latest.get(('supplier_last_seen', supplier), 0), started)
+
+    # A crisis counts once per question, however many tools looked at it
+    for category in crises:
+        counts['crisis', category] += 1
+
+    counts['total', 'fast_path'] += 1 if fast_path else 0
+    return True
+
+
+class KpiStore:
+    """Counters and histograms over the trace log, refreshed incrementally"""
+
+    def __init__(self, db_path: str = KPI_DB, log_paths: tuple = (AGENT_TRACE_LOG,)):
+        self.db_path = db_path
+        self.log_paths = log_paths
+
+    def _connect(self):
+        # Transactions are explicit so concurrent refreshes can't double count
+        db = sqlite3.connect(self.db_path, timeout=10, isolation_level=None)
+        db.execute("CREATE TABLE IF NOT EXISTS log_offsets (path TEXT PRIMARY KEY, inode INTEGER, position INTEGER)")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS counts "
+            "(dimension TEXT NOT NULL, key TEXT NOT NULL, value REAL NOT NULL, PRIMARY KEY (dimension, key))"
+        )
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS latest "
+            "(dimension TEXT NOT NULL, key TEXT NOT NULL, value REAL NOT NULL, PRIMARY KEY (dimension, key))"
+        )
+        return db
+
+    def refresh(self) -> int:
+        """Fold newly appended log lines into the aggregates; returns how many"""
+        return sum(self._refresh_log(path) for path in self.log_paths)
+
+    def _refresh_log(self, path: str) -> int:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return 0
+
+        with closing(self._connect()) as db:
+            db.execute("BEGIN IMMEDIATE")
+            try:
+                row = db.execute("SELECT inode, position FROM log_offsets WHERE path = ?", (path,)).fetchone()
+
+                # A rotated or truncated log is read again from its start
+                position = 0
+                if row is not None and row[0] == stat.st_ino and row[1] <= stat.st_size:
+                    position = row[1]
+
+                if position == stat.st_size:
+                    db.execute("ROLLBACK")
+                    return 0
+
+                counts = Counter()
+                latest = {}
+                events = 0
+
+                with open(path, 'rb') as f:
+                    f.seek(position)
+                    for line in f:
+                        # A line without its newline is still being written
+                        if not line.endswith(b'\n'):
+                            break
+                        position += len(line)
+
+                        # Malformed records are skipped like unparsable lines,
+                        # and only whole records reach the pending deltas
+                        record_counts = Counter()
+                        record_latest = {}
+                        try:
+                            if not fold_record(json.loads(line), record_counts, record_latest):
+                                continue
+                        except (ValueError, KeyError, TypeError, AttributeError):
+                            continue
+
+                        counts.update(record_counts)
+                        for key, value in record_latest.items():
+                            latest[key] = max(latest.get(key, value), value)
+                        events += 1
+
+                db.executemany(
+                    "INSERT INTO counts (dimension, key, value) VALUES (?, ?, ?) "
+                    "ON CONFLICT (dimension, key) DO UPDATE SET value = value + excluded.value",
+                    [(dimension, key, value) for (dimension, key), value in counts.items() if value]
+                )
+                db.executemany(
+                    "INSERT INTO latest (dimension, key, value) VALUES (?, ?, ?) "
+                    "ON CONFLICT (dimension, key) DO UPDATE SET value = MAX(value, excluded.value)",
+                    [(dimension, key, value) for (dimension, key), value in latest.items()]
+                )
+                db.execute(
+                    "INSERT OR REPLACE INTO log_offsets (path, inode, position) VALUES (?, ?, ?)",
+                    (path, stat.st_ino, position)
+                )
+                db.execute("COMMIT")
+                return events
+
+            except Exception:
+                db.execute("ROLLBACK")
+                raise
+
+    def snapshot(self) -> dict:
+        """{'counts': {dimension: {key: value}}, 'latest': {...}}"""
+
+        snapshot = {'counts': {}, 'latest': {}}
+
+        with closing(self._connect()) as db:
+            for table in ('counts', 'latest'):
+                for dimension, key, value in db.execute(f"SELECT dimension, key, value FROM {table}"):
+                    snapshot[table].setdefault(dimension, {})[key] = value
+
+        return snapshot
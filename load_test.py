@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Supply Chain Crisis Manager - Concurrent session load test
+Drives simulated browser sessions through the chat app with Streamlit's
+AppTest (quick action, free-text question, clear, new session) and reports
+rerun latency percentiles, memory per session and the throughput ceiling.
+
+All sessions run in this process and share its caches, agent pool and
+Bedrock client, like sessions on one Streamlit server. AppTest swaps a
+process-wide runtime in and out, so script runs take turns on a lock;
+reruns are CPU-bound under the GIL, so a server sees similar contention,
+and rerun latency includes the wait for a turn.
+
+Run: python load_test.py --sessions 1,5,10,20 [--backend local|bedrock]
+"""
+
+import argparse
+import os
+import resource
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Reruns poll for finished replies at the same pace as the app's fragment
+POLL_SECONDS = 0.5
+
+_script_lock = threading.Lock()
+
+FREE_TEXT_PROMPTS = [
+    "What's the risk level for Samsung in South Korea?",
+    "Find alternative memory suppliers for Micron",
+    "A flood hit Thailand. What is the impact on assembly?",
+    "Generate procurement recommendations for Foxconn with high urgency"
+]
+
+
+def rss_bytes() -> int:
+    """Resident memory of this process"""
+
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        # Peak rather than current RSS (kilobytes on Linux, bytes on macOS)
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def percentile(samples: list, pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+class SimulatedSession:
+    """One browser session, driven through AppTest"""
+
+    def __init__(self, app_path: str, index: int, use_cache: bool, timeout: float):
+        from streamlit.testing.v1 import AppTest
+
+        self.index = index
+        self.use_cache = use_cache
+        self.timeout = timeout
+        self.app = AppTest.from_file(app_path, default_timeout=timeout)
+        self.reruns = []
+        self.answers = []
+        self.errors = 0
+
+    def run(self, action: str):
+        started = time.perf_counter()
+        try:
+            with _script_lock:
+                self.app.run()
+            if self.app.exception:
+                raise RuntimeError(self.app.exception[0].message)
+        except Exception as e:
+            self.errors += 1
+            print(f"Session {self.index}: {action} failed: {str(e)}")
+        self.reruns.append((action, time.perf_counter() - started))
+
+    def click(self, label: str):
+        for button in self.app.button:
+            if button.label == label:
+                button.click()
+                self.run(label)
+                return
+        self.errors += 1
+        print(f"Session {self.index}: no '{label}' button")
+
+    def wait_for_replies(self, asked_at: float):
+        """Rerun like the polling fragment until the answer is in the chat"""
+
+        deadline = asked_at + self.timeout
+        while self.app.session_state['pending_requests'] and time.perf_counter() < deadline:
+            time.sleep(POLL_SECONDS)
+            self.run('poll')
+        if self.app.session_state['pending_requests']:
+            self.errors += 1
+        else:
+            self.answers.append(time.perf_counter() - asked_at)
+
+    def open(self):
+        self.run('load')
+        if not self.use_cache:
+            self.app.checkbox(key='use_prompt_cache').uncheck()
+            self.run('toggle cache')
+
+    def flow(self, step: int, quick_actions: list):
+        """Quick action, free-text question, clear, new session"""
+
+        label, _ = quick_actions[(self.index + step) % len(quick_actions)]
+        asked_at = time.perf_counter()
+        self.click(label)
+        self.wait_for_replies(asked_at)
+
+        self.app.text_input(key='chat_input').input(FREE_TEXT_PROMPTS[(self.index + step) % len(FREE_TEXT_PROMPTS)])
+        asked_at = time.perf_counter()
+        self.click('Send')
+        self.wait_for_replies(asked_at)
+
+        self.click('Clear Chat')
+        self.click('New Session')
+
+
+def run_level(app_path: str, sessions: int, flows: int, use_cache: bool, timeout: float) -> dict:
+    """Run `sessions` concurrent sessions through `flows` flows each"""
+
+    from supply_chain_agent import QUICK_ACTIONS
+
+    memory_before = rss_bytes()
+    simulated = [SimulatedSession(app_path, index, use_cache, timeout) for index in range(sessions)]
+
+    # Sessions stay open for the whole level, as they would in browsers
+    started = time.perf_counter()
+    start_together = threading.Barrier(sessions)
+
+    def drive(session):
+        session.open()
+        start_together.wait()
+        for step in range(flows):
+            session.flow(step, QUICK_ACTIONS)
+
+    with ThreadPoolExecutor(max_workers=sessions) as pool:
+        list(pool.map(drive, simulated))
+
+    elapsed = time.perf_counter() - started
+    memory_after = rss_bytes()
+
+    reruns = [seconds for session in simulated for action, seconds in session.reruns if action != 'poll']
+    polls = [seconds for session in simulated for action, seconds in session.reruns if action == 'poll']
+    answers = [seconds for session in simulated for seconds in session.answers]
+
+    return {
+        'sessions': sessions,
+        'flows': sessions * flows,
+        'elapsed': elapsed,
+        'flows_per_second': sessions * flows / elapsed,
+        'reruns_per_second': sum(len(session.reruns) for session in simulated) / elapsed,
+        'rerun_p50': percentile(reruns, 50),
+        'rerun_p95': percentile(reruns, 95),
+        'rerun_p99': percentile(reruns, 99),
+        'poll_p95': percentile(polls, 95),
+        'answer_p50': percentile(answers, 50),
+        'answer_p95': percentile(answers, 95),
+        'memory_per_session_mb': max(0, memory_after - memory_before) / sessions / 2 ** 20,
+        'errors': sum(session.errors for session in simulated)
+    }
+
+
+def print_report(results: list, p95_budget: float):
+    print()
+    print(f"{'sessions':>8} {'flows/s':>8} {'reruns/s':>9} {'rerun p50':>10} {'p95':>7} {'p99':>7} "
+          f"{'poll p95':>9} {'answer p50':>11} {'p95':>7} {'MB/sess':>8} {'errors':>7}")
+    for r in results:
+        print(f"{r['sessions']:>8} {r['flows_per_second']:>8.2f} {r['reruns_per_second']:>9.1f} "
+              f"{r['rerun_p50']:>9.3f}s {r['rerun_p95']:>6.3f}s {r['rerun_p99']:>6.3f}s "
+              f"{r['poll_p95']:>8.3f}s {r['answer_p50']:>10.2f}s {r['answer_p95']:>6.2f}s "
+              f"{r['memory_per_session_mb']:>8.1f} {r['errors']:>7}")
+
+    # The ceiling is the best throughput reached with reruns still within budget
+    within_budget = [r for r in results if r['rerun_p95'] <= p95_budget and not r['errors']]
+    print()
+    if within_budget:
+        best = max(within_budget, key=lambda r: r['flows_per_second'])
+        print(f"Throughput ceiling: {best['flows_per_second']:.2f} flows/s at {best['sessions']} sessions "
+              f"(rerun p95 {best['rerun_p95']:.3f}s <= {p95_budget:.2f}s budget)")
+    else:
+        print(f"No level kept rerun p95 within {p95_budget:.2f}s without errors")
+
+    over_budget = [r['sessions'] for r in results if r['rerun_p95'] > p95_budget]
+    if over_budget:
+        print(f"Reruns exceed the budget from {min(over_budget)} concurrent sessions")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the chat app with simulated sessions")
+    parser.add_argument('--app', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'newapp.py'),
+                        help="Streamlit script to drive")
+    parser.add_argument('--sessions', default='1,5,10,20',
+                        help="Comma-separated concurrent session counts, one load level each")
+    parser.add_argument('--flows', type=int, default=2,
+                        help="Flows (quick action, question, clear, new session) per session")
+    parser.add_argument('--backend', choices=['local', 'bedrock'], default='local',
+                        help="Agent backend: the local stand-in or the real Bedrock agent")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Turn off cached answers so every question reaches the agent")
+    parser.add_argument('--p95-budget', type=float, default=1.0,
+                        help="Acceptable p95 rerun latency in seconds")
+    parser.add_argument('--timeout', type=float, default=120,
+                        help="Seconds to wait for a rerun or an answer")
+    args = parser.parse_args()
+
+    # Must be set before the app's modules are imported
+    os.environ['AGENT_BACKEND'] = args.backend
+    os.environ.setdefault('PREWARM_ENABLED', 'false')
+
+    from supply_chain_agent import QUICK_ACTIONS
+
+    # One throwaway flow, so imports and first-use setup don't count as session memory
+    warm_up = SimulatedSession(args.app, 0, not args.no_cache, args.timeout)
+    warm_up.open()
+    warm_up.flow(0, QUICK_ACTIONS)
+
+    results = []
+    for sessions in [int(count) for count in args.sessions.split(',')]:
+        print(f"Running {sessions} concurrent session(s)...")
+        results.append(run_level(args.app, sessions, args.flows, not args.no_cache, args.timeout))
+
+    print_report(results, args.p95_budget)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,375 @@
+"""
+Supply Chain Crisis Manager - Local agent stand-in
+Mimics bedrock-agent-runtime invoke_agent without AWS: a deterministic
+planner picks the action group calls for a prompt, runs them in-process
+through lambda1.lambda_handler against the local JSON datasets, and streams
+back a formatted answer (with Bedrock-shaped trace events) at a configurable
+pace. Used for demos, development and load tests (AGENT_BACKEND=local).
+"""
+
+import json
+import os
+import re
+import time
+import uuid
+from contextlib import nullcontext
+
+import lambda1
+from supplier_data import DATA_DIR
+
+# Simulated pacing: seconds per planning/answer model step and between chunks
+LOCAL_AGENT_MODEL_SECONDS = float(os.getenv('LOCAL_AGENT_MODEL_SECONDS', '0.5'))
+LOCAL_AGENT_CHUNK_SECONDS = float(os.getenv('LOCAL_AGENT_CHUNK_SECONDS', '0.02'))
+LOCAL_AGENT_CHUNK_CHARS = int(os.getenv('LOCAL_AGENT_CHUNK_CHARS', '40'))
+LOCAL_AGENT_ACTION_GROUP = os.getenv('LOCAL_AGENT_ACTION_GROUP', 'SupplyChainActions')
+
+CRISIS_KEYWORDS = {
+    'earthquake': 'earthquake',
+    'quake': 'earthquake',
+    'flood': 'flood',
+    'typhoon': 'flood',
+    'strike': 'strike',
+    'port': 'port_closure',
+    'congestion': 'port_closure',
+    'geopolitical': 'geopolitical',
+    'sanction': 'geopolitical',
+    'tension': 'geopolitical'
+}
+
+LOCATION_ALIASES = {
+    'korea': 'South Korea',
+    'united states': 'USA',
+    'america': 'USA',
+    'us': 'USA',
+    'uk': 'United Kingdom',
+    'shanghai': 'China',
+    'shenzhen': 'China',
+    'hsinchu': 'Taiwan'
+}
+
+COMPONENT_ALIASES = {
+    'semiconductor': 'semiconductors',
+    'chip': 'semiconductors',
+    'wafer': 'semiconductors',
+    'dram': 'memory',
+    'nand': 'memory',
+    'battery': 'battery_cells',
+    'raw material': 'raw_materials',
+    'shipping': 'logistics',
+    'freight': 'logistics'
+}
+
+
+def _mentions(text: str, phrase: str) -> int:
+    """Position of phrase (or its plural) as a whole word in text, or -1"""
+
+    match = re.search(r'(?<![\w])' + re.escape(phrase.lower()) + r's?(?![\w])', text)
+    return match.start() if match else -1
+
+
+class ToolCatalog:
+    """Supplier, location and component names the planner can recognise"""
+
+    def __init__(self, supplier_risks: dict, location_risks: dict, alternatives: dict):
+        self.locations = list(location_risks)
+        self.components = list(alternatives)
+
+        # Every supplier listed anywhere, with its home location and component
+        self.home_location = {}
+        self.component_of = {}
+        for component, component_alternatives in alternatives.items():
+            for alt in component_alternatives:
+                self.home_location.setdefault(alt['name'], alt['location'].split('/')[0])
+                self.component_of.setdefault(alt['name'], component)
+        self.suppliers = list(dict.fromkeys(list(supplier_risks) + list(self.home_location)))
+
+        # Suppliers with their own risk score; the rest only appear as alternatives
+        self.scored_suppliers = set(supplier_risks)
+
+    @classmethod
+    def from_datasets(cls, data_dir: str = None):
+        """Catalog of the datasets in data_dir ('' for S3, None for LOCAL_DATA_DIR)"""
+
+        with lambda1.datasets_from(data_dir) if data_dir is not None else nullcontext():
+            return cls(
+                lambda1.load_json('supplier_risks.json'),
+                lambda1.load_json('location_risks.json'),
+                lambda1.load_json('alternatives.json')
+            )
+
+    def resolve_supplier(self, name: str):
+        """Supplier called exactly name (any case), or None"""
+
+        for supplier in self.suppliers:
+            if supplier.lower() == name.strip().lower():
+                return supplier
+        return None
+
+    def resolve_location(self, name: str):
+        name = name.strip().lower()
+        for location in self.locations:
+            if location.lower() == name:
+                return location
+        return LOCATION_ALIASES.get(name)
+
+    def resolve_component(self, name: str):
+        name = name.strip().lower()
+        for candidate in (name, name[:-1] if name.endswith('s') else name):
+            for component in self.components:
+                if component.replace('_', ' ') in (candidate, candidate + 's'):
+                    return component
+            if candidate in COMPONENT_ALIASES:
+                return COMPONENT_ALIASES[candidate]
+        return None
+
+    def find_suppliers(self, text: str) -> list:
+        """Suppliers named in text, in the order they appear"""
+
+        found = [(_mentions(text, name), name) for name in self.suppliers]
+        return [name for position, name in sorted(found) if position >= 0]
+
+    def find_location(self, text: str):
+        found = [(_mentions(text, name), name) for name in self.locations]
+        found += [(_mentions(text, alias), name) for alias, name in LOCATION_ALIASES.items()]
+        found = sorted(item for item in found if item[0] >= 0)
+        return found[0][1] if found else None
+
+    def find_component(self, text: str):
+        # Component names win over looser aliases ("assembly" over "shipping")
+        for names in ([(name.replace('_', ' '), name) for name in self.components], COMPONENT_ALIASES.items()):
+            found = sorted((_mentions(text, phrase), name) for phrase, name in names)
+            found = [item for item in found if item[0] >= 0]
+            if found:
+                return found[0][1]
+        return None
+
+
+def find_crisis_type(text: str):
+    found = sorted((_mentions(text, word), crisis) for word, crisis in CRISIS_KEYWORDS.items())
+    found = [item for item in found if item[0] >= 0]
+    return found[0][1] if found else None
+
+
+def find_severity(text: str) -> str:
+    magnitude = re.search(r'(\d+(?:\.\d+)?)\s*(?:magnitude|earthquake)', text)
+    if magnitude and float(magnitude.group(1)) >= 7:
+        return 'High'
+    if any(word in text for word in ('critical', 'severe', 'major')):
+        return 'High'
+    if any(word in text for word in ('minor', 'small', 'low severity')):
+        return 'Low'
+    return 'Medium'
+
+
+def find_urgency(text: str) -> str:
+    if 'critical' in text:
+        return 'Critical'
+    if 'urgent' in text or 'high urgency' in text:
+        return 'High'
+    if 'low urgency' in text:
+        return 'Low'
+    return 'Medium'
+
+
+def plan_tool_calls(prompt: str, catalog: ToolCatalog) -> list:
+    """Deterministic stand-in for the agent's planning: [(function, params), ...]"""
+
+    text = prompt.lower()
+    suppliers = catalog.find_suppliers(text)
+    location = catalog.find_location(text)
+    component = catalog.find_component(text)
+    crisis_type = find_crisis_type(text)
+
+    wants_risk = 'risk' in text
+    wants_impact = crisis_type is not None or 'impact' in text
+    wants_alternatives = any(word in text for word in ('alternative', 'backup', 'replace'))
+    wants_procurement = any(word in text for word in ('procurement', 'recommend', 'plan'))
+
+    calls = []
+
+    if suppliers and (wants_risk or not (wants_impact or wants_alternatives or wants_procurement)):
+        for supplier in suppliers:
+            calls.append(('analyze_supplier_risk', {
+                'supplier_name': supplier,
+                'location': location or catalog.home_location.get(supplier, 'Unknown')
+            }))
+
+    if wants_impact:
+        region = location or (catalog.home_location.get(suppliers[0]) if suppliers else None)
+        calls.append(('calculate_crisis_impact', {
+            'crisis_type': crisis_type or 'Unknown',
+            'affected_region': region or 'Unknown',
+            'severity': find_severity(text)
+        }))
+
+    if wants_alternatives:
+        if component is None and suppliers:
+            component = catalog.component_of.get(suppliers[0])
+        calls.append(('find_alternative_suppliers', {
+            'component': component or 'Unknown',
+            'affected_supplier': suppliers[0] if suppliers else 'Unknown'
+        }))
+
+    if wants_procurement:
+        calls.append(('generate_procurement_recommendations', {
+            'crisis_type': crisis_type or 'Unknown',
+            'affected_suppliers': ', '.join(suppliers) or 'Unknown',
+            'urgency': find_urgency(text)
+        }))
+
+    return calls
+
+
+def run_tool(function_name: str, params: dict, data_dir: str = None) -> dict:
+    """Run one action group call through the Lambda handler, in-process
+
+    The tools read data_dir ('' for S3, None for LOCAL_DATA_DIR).
+    """
+
+    event = {
+        'messageVersion': '1.0',
+        'actionGroup': LOCAL_AGENT_ACTION_GROUP,
+        'function': function_name,
+        'parameters': [{'name': name, 'type': 'string', 'value': value} for name, value in params.items()]
+    }
+    with lambda1.datasets_from(data_dir) if data_dir is not None else nullcontext():
+        response = lambda1.lambda_handler(event, None)
+    return json.loads(response['response']['functionResponse']['responseBody']['TEXT']['body'])
+
+
+def _format_risk(result: dict) -> str:
+    return (
+        f"**{result['supplier_name']} in {result['location']}: {result['risk_level']} risk "
+        f"({result['risk_score']}/100)**\n"
+        f"- Risk factors: {result['risk_factors']}"
+    )
+
+
+def _format_impact(result: dict) -> str:
+    impact = result['impact_assessment']
+    crisis = result['crisis_type'].replace('_', ' ').title()
+    return (
+        f"**{crisis} impact in {result['affected_region']} ({result['severity']} severity)**\n"
+        f"- Production delay: {impact['production_delay_days']} days\n"
+        f"- Cost increase: {impact['cost_increase_percent']}%\n"
+        f"- Revenue at risk: {impact['revenue_at_risk_percent']}%\n"
+        f"- Recovery time: {impact['recovery_time_weeks']} weeks\n"
+        f"- Affected areas: {', '.join(area.replace('_', ' ') for area in result['affected_components'])}"
+    )
+
+
+def _format_alternatives(result: dict) -> str:
+    component = result['component'].replace('_', ' ')
+    if not result['alternatives']:
+        return f"**No alternative {component} suppliers found for {result['affected_supplier']}.**"
+
+    lines = [f"**Alternative {component} suppliers to {result['affected_supplier']}** ({result['total_options']} options)"]
+    for index, alt in enumerate(result['alternatives'], 1):
+        lines.append(f"{index}. {alt['name']} ({alt['location']}) - {alt['capacity']} capacity, lead time {alt['lead_time']}")
+    lines.append(f"\nRecommended: **{result['recommendation']['name']}**")
+    return "\n".join(lines)
+
+
+def _format_recommendations(result: dict) -> str:
+    lines = [f"**Procurement plan ({result['urgency']} urgency)**"]
+    for index, rec in enumerate(result['recommendations'], 1):
+        detail = rec.get('description') or ', '.join(
+            str(rec[field]) for field in ('supplier', 'component', 'quantity') if field in rec
+        )
+        lines.append(f"{index}. [{rec['priority']}] {rec['action'].replace('_', ' ').capitalize()}: {detail} ({rec['timeline']})")
+    lines.append(f"\nEstimated cost impact: {result['estimated_cost_impact']}, time saved: {result['estimated_time_savings']}")
+    return "\n".join(lines)
+
+
+TOOL_FORMATTERS = {
+    'analyze_supplier_risk': _format_risk,
+    'calculate_crisis_impact': _format_impact,
+    'find_alternative_suppliers': _format_alternatives,
+    'generate_procurement_recommendations': _format_recommendations
+}
+
+
+def format_tool_result(function_name: str, result: dict) -> str:
+    """Markdown summary of one tool result"""
+
+    if 'error' in result:
+        return f"Could not run {function_name}: {result['error']}"
+    return TOOL_FORMATTERS[function_name](result)
+
+
+HELP_TEXT = (
+    "I can analyze supplier risk, estimate crisis impact, find alternative suppliers "
+    "and draft procurement plans. Try naming a supplier, for example: "
+    "\"Analyze the risk level for TSMC supplier in Taiwan\"."
+)
+
+
+class LocalAgentRuntime:
+    """Drop-in for the bedrock-agent-runtime client's invoke_agent"""
+
+    def __init__(self, data_dir: str = DATA_DIR):
+        # The Lambda reads the same datasets as the apps instead of S3
+        self.data_dir = data_dir
+        self.catalog = ToolCatalog.from_datasets(data_dir)
+
+    def invoke_agent(self, agentId=None, agentAliasId=None, sessionId=None, inputText='',
+                     enableTrace=False, streamingConfigurations=None, **kwargs):
+        """Same request and response shape as the Bedrock API"""
+
+        return {
+            'completion': self._completion(inputText, sessionId or uuid.uuid4().hex, enableTrace),
+            'contentType': 'application/json',
+            'sessionId': sessionId
+        }
+
+    def _completion(self, prompt: str, session_id: str, enable_trace: bool):
+        """Event stream: trace events while planning and calling tools, then text chunks"""
+
+        def trace(trace_id, **detail):
+            if enable_trace:
+                return {'trace': {'trace': {'orchestrationTrace': {
+                    kind: dict(body, traceId=trace_id) for kind, body in detail.items()
+                }}}}
+            return None
+
+        def model_step(trace_id):
+            events = [trace(trace_id, modelInvocationInput={'type': 'ORCHESTRATION'})]
+            time.sleep(LOCAL_AGENT_MODEL_SECONDS)
+            events.append(trace(trace_id, modelInvocationOutput={'metadata': {'usage': {'inputTokens': 0, 'outputTokens': 0}}}))
+            return events
+
+        calls = plan_tool_calls(prompt, self.catalog)
+        sections = []
+
+        for step, (function_name, params) in enumerate(calls):
+            trace_id = f"{session_id}-{step}"
+            yield from filter(None, model_step(trace_id))
+
+            event = trace(trace_id, invocationInput={
+                'invocationType': 'ACTION_GROUP',
+                'actionGroupInvocationInput': {
+                    'actionGroupName': LOCAL_AGENT_ACTION_GROUP,
+                    'function': function_name,
+                    'parameters': [{'name': name, 'type': 'string', 'value': value} for name, value in params.items()]
+                }
+            })
+            if event:
+                yield event
+
+            sections.append(format_tool_result(function_name, run_tool(function_name, params, self.data_dir)))
+
+            event = trace(trace_id, observation={'type': 'ACTION_GROUP'})
+            if event:
+                yield event
+
+        final_id = f"{session_id}-{len(calls)}"
+        yield from filter(None, model_step(final_id))
+        event = trace(final_id, observation={'type': 'FINISH'})
+        if event:
+            yield event
+
+        answer = "\n\n".join(sections) or HELP_TEXT
+        for start in range(0, len(answer), LOCAL_AGENT_CHUNK_CHARS):
+            if start:
+                time.sleep(LOCAL_AGENT_CHUNK_SECONDS)
+            yield {'chunk': {'bytes': answer[start:start + LOCAL_AGENT_CHUNK_CHARS].encode('utf-8')}}
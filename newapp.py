@@ -5,12 +5,16 @@ Save as chatbot/app.py
 """
 
 import streamlit as st
-import boto3
-import time
+import uuid
 from datetime import datetime
-import os
 from dotenv import load_dotenv
 
+from bulk_questions import BULK_PARALLELISM, BulkRun, questions_from_csv
+from chat_history import ChatHistory
+from response_cache import cached_answer, get_prompt_cache, get_prompt_warmer, remember_answer
+from intent_router import FAST_PATH_ENABLED
+from supply_chain_agent import QUICK_ACTIONS, SupplyChainAgent, get_intent_router, submit_agent_job
+
 # Load environment variables
 load_dotenv()
 
@@ -172,63 +176,26 @@ body {
 """, unsafe_allow_html=True)
 
 
-class SupplyChainAgent:
-    """Supply Chain Crisis Manager AI Agent"""
-    
-    def __init__(self):
-        self.agent_id = os.getenv('BEDROCK_AGENT_ID')
-        self.agent_alias_id = os.getenv('BEDROCK_AGENT_ALIAS_ID')
-        self.region = os.getenv('AWS_REGION', 'us-east-1')
-        print(self.agent_id)
-        
-        self.bedrock_agent_runtime = boto3.client(
-            'bedrock-agent-runtime', 
-            region_name=self.region
-        )
-    
-    def invoke_agent(self, prompt: str, session_id: str):
-        """Send message to the Bedrock Agent"""
-        
-        try:
-            response = self.bedrock_agent_runtime.invoke_agent(
-                agentId=self.agent_id,
-                agentAliasId=self.agent_alias_id,
-                sessionId=session_id,
-                inputText=prompt
-            )
-            
-            # Process streaming response
-            full_response = ""
-            for event in response['completion']:
-                if 'chunk' in event:
-                    chunk = event['chunk']
-                    if 'bytes' in chunk:
-                        chunk_text = chunk['bytes'].decode('utf-8')
-                        full_response += chunk_text
-            
-            return {
-                "response": full_response,
-                "success": True,
-                "timestamp": datetime.now()
-            }
-            
-        except Exception as e:
-            return {
-                "response": f"Error: {str(e)}",
-                "success": False,
-                "timestamp": datetime.now()
-            }
+# Messages rendered per page of chat history
+CHAT_RENDER_MESSAGES = 20
 
 # Initialize session state
+if 'session_id' not in st.session_state:
+    st.session_state.session_id = f"session-{uuid.uuid4().hex[:12]}"
+
 if 'messages' not in st.session_state:
-    st.session_state.messages = []
+    st.session_state.messages = ChatHistory(st.session_state.session_id)
 
-if 'session_id' not in st.session_state:
-    st.session_state.session_id = f"session-{int(time.time())}"
+if 'history_shown' not in st.session_state:
+    st.session_state.history_shown = CHAT_RENDER_MESSAGES
 
 if 'agent' not in st.session_state:
     st.session_state.agent = SupplyChainAgent()
 
+# Agent invocations still running, by request id
+if 'pending_requests' not in st.session_state:
+    st.session_state.pending_requests = {}
+
 def display_header():
     """Display the main header"""
     
@@ -245,47 +212,110 @@ def display_quick_actions():
     
     st.subheader("Quick Actions")
     
-    col1, col2, col3, col4 = st.columns(4)
-    
-    with col1:
-        if st.button("Analyze TSMC Risk"):
-            handle_quick_action("Analyze the risk level for TSMC supplier in Taiwan")
-    
-    with col2:
-        if st.button("Taiwan Earthquake Impact"):
-            handle_quick_action("A 7.2 earthquake hit Taiwan affecting TSMC. Analyze impact and provide recommendations.")
+    columns = st.columns(len(QUICK_ACTIONS))
     
-    with col3:
-        if st.button("Find Alternatives"):
-            handle_quick_action("Find alternative suppliers for semiconductors if TSMC is affected")
+    for column, (label, prompt) in zip(columns, QUICK_ACTIONS):
+        with column:
+            if st.button(label):
+                handle_quick_action(prompt)
     
-    with col4:
-        if st.button("Procurement Plan"):
-            handle_quick_action("Generate procurement recommendations for a crisis affecting TSMC with critical urgency")
+    if st.button("Run All Quick Actions"):
+        for _, prompt in QUICK_ACTIONS:
+            submit_prompt(prompt)
+        st.rerun()
 
 def handle_quick_action(prompt):
     """Handle quick action button clicks"""
     
+    submit_prompt(prompt)
+    st.rerun()
+
+def submit_prompt(prompt):
+    """Send a question to the agent in the background"""
+    
+    # Quick actions and scenarios are answered instantly from the shared cache
+    cached = cached_answer(prompt) if st.session_state.get("use_prompt_cache", True) else None
+    if cached is not None:
+        st.session_state.messages.append({
+            "role": "user",
+            "content": prompt,
+            "timestamp": datetime.now()
+        })
+        st.session_state.messages.append({
+            "role": "agent",
+            "content": cached["response"],
+            "success": True,
+            "timestamp": datetime.now(),
+            "cached_at": cached["cached_at"]
+        })
+        return
+    
+    # Bedrock handles one request at a time per session, so questions asked
+    # while another one is in flight run in a session of their own
+    session_id = st.session_state.session_id
+    if st.session_state.pending_requests:
+        session_id = f"{session_id}-{uuid.uuid4().hex[:8]}"
+    
+    st.session_state.agent.fast_path_enabled = st.session_state.get("use_fast_path", FAST_PATH_ENABLED)
+    job = submit_agent_job(st.session_state.agent, prompt, session_id)
+    st.session_state.pending_requests[job.request_id] = job
+    
     # Add user message
     st.session_state.messages.append({
         "role": "user",
         "content": prompt,
-        "timestamp": datetime.now()
+        "timestamp": datetime.now(),
+        "request_id": job.request_id
     })
+
+def collect_agent_reply(job):
+    """Add a finished job's answer to the chat, right after its question"""
     
-    # Get agent response
-    with st.spinner("Agent is analyzing..."):
-        response = st.session_state.agent.invoke_agent(prompt, st.session_state.session_id)
+    if job.success:
+        remember_answer(job.prompt, job.text)
     
-    # Add agent response
-    st.session_state.messages.append({
+    if job.stats.get("trace") is not None:
+        st.session_state.last_trace = job.stats["trace"].to_record()
+    
+    st.session_state.messages.insert_after(job.request_id, {
         "role": "agent",
-        "content": response["response"],
-        "success": response["success"],
-        "timestamp": response["timestamp"]
+        "content": job.text,
+        "success": job.success,
+        "timestamp": datetime.now(),
+        "request_id": job.request_id,
+        "time_to_first_byte": job.stats.get("time_to_first_byte"),
+        "total_time": job.stats.get("total_time"),
+        "retries": job.stats.get("retries", 0),
+        "fast_path": job.stats.get("fast_path", False)
     })
+
+@st.fragment(run_every=0.5)
+def display_pending_replies():
+    """Show in-flight agent replies as they stream in and collect finished ones"""
     
-    st.rerun()
+    pending = st.session_state.pending_requests
+    
+    finished = [job for job in pending.values() if job.done]
+    if finished:
+        for job in finished:
+            collect_agent_reply(job)
+            del pending[job.request_id]
+        st.rerun()
+    
+    for job in pending.values():
+        if job.text:
+            text = job.text + " ▌"
+        elif job.started:
+            text = "<em>Agent is analyzing...</em>"
+        else:
+            text = "<em>Queued...</em>"
+        
+        st.markdown(f'''
+        <div class="agent-message">
+            <strong>Agent</strong> <small>(re: {job.prompt[:60]})</small><br>
+            {text}
+        </div>
+        ''', unsafe_allow_html=True)
 
 def display_chat_interface():
     """Display the main chat interface"""
@@ -304,28 +334,52 @@ def display_chat_interface():
             </div>
             ''', unsafe_allow_html=True)
         
+        # Only the newest messages are rendered; older ones load on demand
+        history = st.session_state.messages
+        shown = min(len(history), st.session_state.history_shown)
+        hidden = len(history) - shown
+        
+        if hidden and st.button(f"Show earlier messages ({hidden} hidden)"):
+            st.session_state.history_shown += CHAT_RENDER_MESSAGES
+            st.rerun()
+        
         # Display messages
-        for message in st.session_state.messages:
-            timestamp = message["timestamp"].strftime("%H:%M:%S")
-            
-            if message["role"] == "user":
-                st.markdown(f'''
-                <div class="user-message">
-                    <strong>You</strong> <small>({timestamp})</small><br>
-                    {message["content"]}
-                </div>
-                ''', unsafe_allow_html=True)
-            
-            elif message["role"] == "agent":
-                st.markdown(f'''
-                <div class="agent-message">
-                    <strong>Agent</strong> <small>({timestamp})</small><br>
-                    {message["content"]}
-                </div>
-                ''', unsafe_allow_html=True)
+        for message in history.tail(shown):
+            display_message(message)
+        
+        if st.session_state.pending_requests:
+            display_pending_replies()
         
         st.markdown('</div>', unsafe_allow_html=True)
 
+def display_message(message):
+    """Display a single chat message"""
+    
+    timestamp = message["timestamp"].strftime("%H:%M:%S")
+    
+    if message["role"] == "user":
+        st.markdown(f'''
+        <div class="user-message">
+            <strong>You</strong> <small>({timestamp})</small><br>
+            {message["content"]}
+        </div>
+        ''', unsafe_allow_html=True)
+    
+    elif message["role"] == "agent":
+        if message.get("cached_at"):
+            timestamp += f" · cached at {message['cached_at'].strftime('%H:%M:%S')}"
+        if message.get("retries"):
+            timestamp += f" · {message['retries']} retries"
+        if message.get("fast_path"):
+            timestamp += " · answered directly"
+        
+        st.markdown(f'''
+        <div class="agent-message">
+            <strong>Agent</strong> <small>({timestamp})</small><br>
+            {message["content"]}
+        </div>
+        ''', unsafe_allow_html=True)
+
 def display_chat_input():
     """Display chat input interface"""
     
@@ -343,26 +397,92 @@ def display_chat_input():
     
     # Handle input
     if send_button and user_input:
-        # Add user message
-        st.session_state.messages.append({
-            "role": "user",
-            "content": user_input,
-            "timestamp": datetime.now()
-        })
+        submit_prompt(user_input)
+        st.rerun()
+
+def display_bulk_mode():
+    """Answer a CSV of questions concurrently"""
+    
+    with st.expander("📄 Bulk Questions (CSV upload)"):
+        st.caption("Upload a CSV with a 'question' column, or 'supplier' rows with a 'location' or 'component' column.")
         
-        # Get agent response
-        with st.spinner("Agent is processing..."):
-            response = st.session_state.agent.invoke_agent(user_input, st.session_state.session_id)
+        uploaded = st.file_uploader("Questions CSV", type="csv", key="bulk_csv")
+        parallelism = st.number_input("Questions answered at a time", min_value=1, max_value=32, value=BULK_PARALLELISM)
         
-        # Add agent response
-        st.session_state.messages.append({
-            "role": "agent",
-            "content": response["response"],
-            "success": response["success"],
-            "timestamp": response["timestamp"]
-        })
+        if uploaded is not None and st.button("Answer All", type="primary"):
+            try:
+                questions = questions_from_csv(uploaded)
+            except ValueError as e:
+                st.error(str(e))
+            else:
+                if st.session_state.get("bulk_run") is not None:
+                    st.session_state.bulk_run.cancel()
+                # Templated rows take the fast path, the rest go to the agent
+                bulk_agent = SupplyChainAgent()
+                bulk_agent.fast_path_enabled = True
+                st.session_state.bulk_run = BulkRun(bulk_agent, questions, int(parallelism))
+        
+        bulk = st.session_state.get("bulk_run")
+        if bulk is None:
+            return
         
+        if bulk.done:
+            display_bulk_results(bulk)
+        else:
+            display_bulk_progress()
+
+@st.fragment(run_every=0.5)
+def display_bulk_progress():
+    """Progress of the running batch, refreshed as answers arrive"""
+    
+    bulk = st.session_state.bulk_run
+    if bulk.done:
         st.rerun()
+    
+    display_bulk_results(bulk)
+    
+    if st.button("Cancel remaining"):
+        bulk.cancel()
+
+def display_bulk_results(bulk):
+    """Progress bar, results table and download for a batch"""
+    
+    st.progress(bulk.finished / len(bulk.jobs), text=f"{bulk.finished}/{len(bulk.jobs)} questions done")
+    
+    results = bulk.results()
+    st.dataframe(results, hide_index=True, use_container_width=True)
+    st.download_button(
+        "Download results (CSV)",
+        results.to_csv(index=False),
+        file_name=f"bulk-answers-{bulk.batch_id}.csv",
+        mime="text/csv"
+    )
+
+def display_trace_panel():
+    """Display the latency breakdown of the last agent answer"""
+    
+    trace = st.session_state.get("last_trace")
+    if not trace:
+        return
+    
+    totals = trace["totals"]
+    
+    st.sidebar.header("Last Agent Trace")
+    st.sidebar.text(f"Total: {trace['total_seconds']:.1f}s")
+    st.sidebar.text(f"Model: {totals['model_seconds']:.1f}s ({totals['model_calls']} calls)")
+    st.sidebar.text(f"Tools: {totals['tool_seconds']:.1f}s ({totals['tool_calls']} calls)")
+    st.sidebar.text(f"Orchestration steps: {totals['orchestration_steps']}")
+    st.sidebar.text(f"Retries: {trace['retries']}{' (hedged)' if trace['hedged'] else ''}")
+    
+    with st.sidebar.expander("Timeline"):
+        st.dataframe(
+            [
+                {"at (s)": step["start"], "step": step["name"], "duration (s)": step["duration"]}
+                for step in trace["steps"]
+            ],
+            hide_index=True,
+            use_container_width=True
+        )
 
 def display_sidebar():
     """Display sidebar with controls"""
@@ -371,16 +491,38 @@ def display_sidebar():
     
     st.sidebar.text(f"Session: {st.session_state.session_id[:8]}...")
     st.sidebar.text(f"Messages: {len(st.session_state.messages)}")
+    st.sidebar.text(f"In flight: {len(st.session_state.pending_requests)}")
+    
+    timed_replies = [m for m in st.session_state.messages if m.get("time_to_first_byte") is not None]
+    if timed_replies:
+        last_reply = timed_replies[-1]
+        st.sidebar.text(f"First byte: {last_reply['time_to_first_byte']:.1f}s / total: {last_reply['total_time']:.1f}s")
+    
+    prompt_cache = get_prompt_cache()
+    st.sidebar.checkbox("Use cached answers", value=True, key="use_prompt_cache")
+    st.sidebar.text(f"Cached answers: {len(prompt_cache)} (hits: {prompt_cache.hits})")
+    st.sidebar.text(get_prompt_warmer().summary())
+    
+    st.sidebar.checkbox("Answer simple questions directly", value=FAST_PATH_ENABLED, key="use_fast_path")
+    st.sidebar.text(get_intent_router().summary())
     
     if st.sidebar.button("Clear Chat"):
-        st.session_state.messages = []
+        st.session_state.messages.clear()
+        st.session_state.history_shown = CHAT_RENDER_MESSAGES
+        st.session_state.pending_requests = {}
         st.rerun()
     
     if st.sidebar.button("New Session"):
-        st.session_state.session_id = f"session-{int(time.time())}"
-        st.session_state.messages = []
+        # The old session's spilled transcript goes with it
+        st.session_state.messages.clear()
+        st.session_state.session_id = f"session-{uuid.uuid4().hex[:12]}"
+        st.session_state.messages = ChatHistory(st.session_state.session_id)
+        st.session_state.history_shown = CHAT_RENDER_MESSAGES
+        st.session_state.pending_requests = {}
         st.rerun()
     
+    display_trace_panel()
+    
     st.sidebar.header("Capabilities")
     st.sidebar.markdown("""
     **I can help with:**
@@ -408,10 +550,13 @@ def display_sidebar():
 def main():
     """Main application"""
     
+    get_prompt_warmer().ensure_warm()
+    
     display_header()
     display_quick_actions()
     display_chat_interface()
     display_chat_input()
+    display_bulk_mode()
     display_sidebar()
 
 if __name__ == "__main__":
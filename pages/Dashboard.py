@@ -4,6 +4,14 @@ import plotly.express as px
 import pandas as pd
 from datetime import datetime, timedelta
 import random
+import time
+
+import numpy as np
+
+from downsampling import lttb, window
+from kpi_store import KpiStore, histogram_percentile
+from roi_analysis import AXIS_LABELS, DEFAULT_SAVINGS_RATE, GRID_AXES, nearest_index, roi_metrics, sensitivity_grid, tornado
+from supplier_data import supplier_frame
 
 # Page configuration
 st.set_page_config(
@@ -116,6 +124,17 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+@st.cache_resource
+def get_kpi_store():
+    """KPI aggregates shared by every dashboard session"""
+    return KpiStore()
+
+def load_kpis():
+    """Fold in new log events, then read the pre-aggregated KPIs"""
+    store = get_kpi_store()
+    store.refresh()
+    return store.snapshot()
+
 def display_header():
     """Display dashboard header"""
     st.markdown("""
@@ -125,47 +144,60 @@ def display_header():
     </div>
     """, unsafe_allow_html=True)
 
-def display_key_metrics():
+def display_key_metrics(kpis):
     """Display top-level KPI metrics"""
     st.markdown('<h2 class="section-title">Key Performance Indicators</h2>', unsafe_allow_html=True)
     
+    counts = kpis['counts']
+    totals = counts.get('total', {})
+    invocations = int(totals.get('invocations', 0))
+    
+    if not invocations:
+        st.info("No agent activity logged yet. These KPIs fill in as questions are answered.")
+    
+    median_seconds = histogram_percentile(counts.get('latency_total', {}), 50)
+    p95_seconds = histogram_percentile(counts.get('latency_total', {}), 95)
+    succeeded = int(totals.get('succeeded', 0))
+    today = int(counts.get('day', {}).get(datetime.now().date().isoformat(), 0))
+    suppliers = set(kpis['latest'].get('supplier_last_seen', {}))
+    
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
         st.metric(
-            label="Response Time Reduction",
-            value="92%",
-            delta="-3 weeks to 2 hours",
-            delta_color="normal"
+            label="Median Response Time",
+            value=f"≤{median_seconds:g}s" if median_seconds is not None else "—",
+            delta=f"p95 ≤{p95_seconds:g}s (vs 3 weeks manual)" if p95_seconds is not None else None,
+            delta_color="off"
         )
     
     with col2:
         st.metric(
-            label="Cost Savings per Crisis",
-            value="$7.3M",
-            delta="+450% ROI",
+            label="Questions Answered",
+            value=f"{succeeded:,}",
+            delta=f"{succeeded / invocations:.0%} success" if invocations else None,
             delta_color="normal"
         )
     
     with col3:
         st.metric(
-            label="Risk Reduction",
-            value="70%",
-            delta="Fewer disruptions",
+            label="Crises Analyzed",
+            value=f"{int(sum(counts.get('crisis', {}).values())):,}",
+            delta=f"+{today} questions today",
             delta_color="normal"
         )
     
     with col4:
         st.metric(
-            label="Crises Prevented",
-            value="24",
-            delta="+24 since launch",
-            delta_color="normal"
+            label="Suppliers Monitored",
+            value=f"{len(suppliers)}",
+            delta=f"{totals.get('fast_path', 0) / invocations:.0%} answered directly" if invocations else None,
+            delta_color="off"
         )
 
-def display_comparison_chart():
-    """Display before/after comparison"""
-    st.markdown('<h2 class="section-title">Traditional vs AI-Powered Response</h2>', unsafe_allow_html=True)
+@st.cache_data
+def comparison_figure():
+    """Traditional vs agent comparison chart, as a figure spec"""
     
     # Create comparison data
     metrics = ['Detection Time', 'Analysis Time', 'Action Time', 'Total Cost']
@@ -208,21 +240,44 @@ def display_comparison_chart():
         )
     )
     
-    st.plotly_chart(fig, use_container_width=True)
+    return fig.to_dict()
 
-def display_cost_impact():
-    """Display cost impact over time"""
-    st.markdown('<h2 class="section-title">Cumulative Cost Savings</h2>', unsafe_allow_html=True)
+def display_comparison_chart():
+    """Display before/after comparison"""
+    st.markdown('<h2 class="section-title">Traditional vs AI-Powered Response</h2>', unsafe_allow_html=True)
     
-    # Generate data for 12 months
-    months = pd.date_range(start='2024-01-01', periods=12, freq='M')
-    cumulative_savings = [1.2, 3.5, 5.8, 9.2, 12.5, 16.8, 21.3, 25.7, 30.4, 35.2, 40.1, 45.6]
+    st.plotly_chart(comparison_figure(), use_container_width=True)
+
+def savings_history():
+    """Month-end dates and cumulative savings ($M) for the savings chart"""
+    
+    # 12 months of data for now
+    months = pd.date_range(start='2024-01-01', periods=12, freq='M').to_numpy()
+    cumulative_savings = np.array([1.2, 3.5, 5.8, 9.2, 12.5, 16.8, 21.3, 25.7, 30.4, 35.2, 40.1, 45.6])
+    return months, cumulative_savings
+
+@st.cache_data(max_entries=64)
+def cost_impact_figure(months, cumulative_savings, start=None, end=None):
+    """Cumulative savings chart between two dates, as a figure spec
+    
+    The series is passed in so it is part of the cache key: new savings
+    data gets a new chart. Returns (figure, points plotted, points in the
+    range); long ranges are downsampled to the chart's point budget.
+    """
+    
+    months, cumulative_savings = window(
+        months,
+        cumulative_savings,
+        start=np.datetime64(start) if start else None,
+        end=np.datetime64(end) if end else None
+    )
+    kept = lttb(months, cumulative_savings)
     
     fig = go.Figure()
     
     fig.add_trace(go.Scatter(
-        x=months,
-        y=cumulative_savings,
+        x=months[kept],
+        y=cumulative_savings[kept],
         mode='lines+markers',
         name='Cumulative Savings',
         line=dict(color='#10b981', width=3),
@@ -240,34 +295,69 @@ def display_cost_impact():
         hovermode='x unified'
     )
     
-    st.plotly_chart(fig, use_container_width=True)
+    return fig.to_dict(), len(kept), len(months)
 
-def display_crisis_breakdown():
+@st.fragment
+def display_cost_impact():
+    """Display cost impact over time"""
+    st.markdown('<h2 class="section-title">Cumulative Cost Savings</h2>', unsafe_allow_html=True)
+    
+    months, cumulative_savings = savings_history()
+    first, last = pd.Timestamp(months[0]).date(), pd.Timestamp(months[-1]).date()
+    
+    # Zooming re-fetches the narrower range at full point budget
+    start, end = st.slider(
+        "Date range",
+        min_value=first,
+        max_value=last,
+        value=(first, last),
+        format="MMM YYYY",
+        key="savings_range"
+    )
+    
+    figure, plotted, total = cost_impact_figure(months, cumulative_savings, start, end)
+    st.plotly_chart(figure, use_container_width=True)
+    
+    if plotted < total:
+        st.caption(f"Showing {plotted:,} of {total:,} points; narrow the date range for more detail")
+
+@st.cache_data
+def crisis_pie_figure(crisis_data):
+    """Crisis distribution pie, as a figure spec"""
+    
+    fig = px.pie(
+        crisis_data,
+        values='Count',
+        names='Type',
+        title='Crisis Distribution',
+        color_discrete_sequence=px.colors.sequential.Blues_r
+    )
+    
+    fig.update_traces(textposition='inside', textinfo='percent+label')
+    fig.update_layout(height=400)
+    
+    return fig.to_dict()
+
+def display_crisis_breakdown(kpis):
     """Display crisis types handled"""
     st.markdown('<h2 class="section-title">Crisis Types Handled</h2>', unsafe_allow_html=True)
     
+    crisis_counts = kpis['counts'].get('crisis', {})
+    if not crisis_counts:
+        st.info("No crises analyzed yet.")
+        return
+    
     col1, col2 = st.columns([2, 1])
     
     with col1:
         # Crisis types pie chart
         crisis_data = pd.DataFrame({
-            'Type': ['Natural Disasters', 'Geopolitical Events', 'Supplier Issues', 'Port Disruptions', 'Labor Strikes'],
-            'Count': [8, 5, 6, 3, 2],
-            'Avg_Savings': [9.2, 8.5, 5.3, 4.1, 3.8]
-        })
+            'Type': list(crisis_counts),
+            'Count': [int(count) for count in crisis_counts.values()]
+        }).sort_values('Count', ascending=False)
+        crisis_data['Share'] = crisis_data['Count'] / crisis_data['Count'].sum()
         
-        fig = px.pie(
-            crisis_data,
-            values='Count',
-            names='Type',
-            title='Crisis Distribution',
-            color_discrete_sequence=px.colors.sequential.Blues_r
-        )
-        
-        fig.update_traces(textposition='inside', textinfo='percent+label')
-        fig.update_layout(height=400)
-        
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(crisis_pie_figure(crisis_data), use_container_width=True)
     
     with col2:
         st.markdown("### Crisis Impact Summary")
@@ -276,15 +366,15 @@ def display_crisis_breakdown():
             <div style="background: #f9fafb; padding: 1rem; border-radius: 8px; margin-bottom: 0.5rem; border-left: 3px solid #3b82f6;">
                 <div style="font-weight: 600; color: #1f2937;">{row['Type']}</div>
                 <div style="color: #6b7280; font-size: 0.9rem;">
-                    {row['Count']} incidents handled<br>
-                    Avg savings: ${row['Avg_Savings']}M
+                    {row['Count']} incidents analyzed<br>
+                    {row['Share']:.0%} of all crises
                 </div>
             </div>
             """, unsafe_allow_html=True)
 
-def display_response_times():
-    """Display response time improvements"""
-    st.markdown('<h2 class="section-title">Response Time Analytics</h2>', unsafe_allow_html=True)
+@st.cache_data
+def response_funnel_figure():
+    """Response time funnel, as a figure spec"""
     
     # Create data
     stages = ['Crisis<br>Detection', 'Impact<br>Analysis', 'Alternative<br>Sourcing', 'Procurement<br>Plan', 'Action<br>Execution']
@@ -316,7 +406,13 @@ def display_response_times():
         showlegend=True
     )
     
-    st.plotly_chart(fig, use_container_width=True)
+    return fig.to_dict()
+
+def display_response_times():
+    """Display response time improvements"""
+    st.markdown('<h2 class="section-title">Response Time Analytics</h2>', unsafe_allow_html=True)
+    
+    st.plotly_chart(response_funnel_figure(), use_container_width=True)
 
 def display_case_studies():
     """Display real-world case study examples"""
@@ -395,6 +491,37 @@ def display_case_studies():
         
         st.markdown('</div>', unsafe_allow_html=True)
 
+@st.cache_data(max_entries=256)
+def roi_figure(annual_crisis_cost, implementation_cost, annual_savings, net_savings):
+    """ROI breakdown bars for one set of calculator inputs, as a figure spec"""
+    
+    roi_data = pd.DataFrame({
+        'Category': ['Current Crisis Costs', 'Implementation Cost', 'Annual Savings', 'Net Benefit'],
+        'Amount': [annual_crisis_cost/1000, implementation_cost/1000, annual_savings/1000, net_savings/1000],
+        'Color': ['#ef4444', '#f59e0b', '#10b981', '#3b82f6']
+    })
+    
+    fig = go.Figure(data=[
+        go.Bar(
+            x=roi_data['Category'],
+            y=roi_data['Amount'],
+            marker_color=roi_data['Color'],
+            text=[f'${v:.1f}M' for v in roi_data['Amount']],
+            textposition='outside'
+        )
+    ])
+    
+    fig.update_layout(
+        height=350,
+        yaxis_title='Amount (Millions USD)',
+        template='plotly_white',
+        showlegend=False
+    )
+    
+    return fig.to_dict()
+
+# Only the calculator reruns when its inputs change, not the whole page
+@st.fragment
 def display_roi_calculator():
     """Display ROI calculator"""
     st.markdown('<h2 class="section-title">ROI Calculator</h2>', unsafe_allow_html=True)
@@ -407,14 +534,15 @@ def display_roi_calculator():
         crises_per_year = st.slider("Expected crises per year", 1, 50, 12)
         avg_crisis_cost = st.slider("Avg cost per crisis ($M)", 1.0, 20.0, 5.0, 0.5)
         implementation_cost = st.number_input("Implementation cost ($K)", 50, 500, 150)
+        savings_rate = st.slider("Crisis cost saved (%)", 30, 95, int(DEFAULT_SAVINGS_RATE * 100), 5) / 100
         
         # Calculate ROI
-        annual_crisis_cost = crises_per_year * avg_crisis_cost * 1000  # in thousands
-        savings_rate = 0.70  # 70% cost reduction
-        annual_savings = annual_crisis_cost * savings_rate
-        net_savings = annual_savings - implementation_cost
-        roi_percent = (net_savings / implementation_cost) * 100
-        payback_months = (implementation_cost / (annual_savings / 12))
+        roi = roi_metrics(crises_per_year, avg_crisis_cost, implementation_cost, savings_rate)
+        annual_crisis_cost = float(roi['annual_crisis_cost'])  # in thousands
+        annual_savings = float(roi['annual_savings'])
+        net_savings = float(roi['net_savings'])
+        roi_percent = float(roi['roi_percent'])
+        payback_months = float(roi['payback_months'])
         
     with col2:
         st.markdown("### Your ROI Analysis")
@@ -431,61 +559,153 @@ def display_roi_calculator():
             st.metric("Payback Period", f"{payback_months:.1f} months")
         
         # ROI breakdown chart
-        roi_data = pd.DataFrame({
-            'Category': ['Current Crisis Costs', 'Implementation Cost', 'Annual Savings', 'Net Benefit'],
-            'Amount': [annual_crisis_cost/1000, implementation_cost/1000, annual_savings/1000, net_savings/1000],
-            'Color': ['#ef4444', '#f59e0b', '#10b981', '#3b82f6']
-        })
-        
-        fig = go.Figure(data=[
-            go.Bar(
-                x=roi_data['Category'],
-                y=roi_data['Amount'],
-                marker_color=roi_data['Color'],
-                text=[f'${v:.1f}M' for v in roi_data['Amount']],
-                textposition='outside'
-            )
-        ])
-        
+        st.plotly_chart(
+            roi_figure(annual_crisis_cost, implementation_cost, annual_savings, net_savings),
+            use_container_width=True
+        )
+    
+    if st.toggle("Sensitivity analysis (every input combination)"):
+        display_roi_sensitivity(crises_per_year, avg_crisis_cost, implementation_cost, savings_rate)
+
+def display_roi_sensitivity(crises_per_year, avg_crisis_cost, implementation_cost, savings_rate):
+    """ROI heatmaps and tornado chart over the whole calculator input grid"""
+    
+    started = time.perf_counter()
+    grid = sensitivity_grid()
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    
+    st.caption(f"{grid['roi_percent'].size:,} scenarios evaluated in {elapsed_ms:.0f} ms")
+    
+    implementation_index = nearest_index('implementation_cost', implementation_cost)
+    rate_index = nearest_index('savings_rate', savings_rate)
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        # Crises x cost at the chosen implementation cost and savings rate
+        fig = go.Figure(go.Heatmap(
+            x=GRID_AXES['crises_per_year'],
+            y=GRID_AXES['avg_crisis_cost'],
+            z=grid['roi_percent'][:, :, implementation_index, rate_index].T,
+            colorscale='RdYlGn',
+            colorbar=dict(title='ROI %')
+        ))
         fig.update_layout(
-            height=350,
-            yaxis_title='Amount (Millions USD)',
-            template='plotly_white',
-            showlegend=False
+            height=400,
+            title=f"ROI at ${GRID_AXES['implementation_cost'][implementation_index]:.0f}K, "
+                  f"{GRID_AXES['savings_rate'][rate_index]:.0%} saved",
+            xaxis_title=AXIS_LABELS['crises_per_year'],
+            yaxis_title=AXIS_LABELS['avg_crisis_cost'],
+            template='plotly_white'
+        )
+        st.plotly_chart(fig, use_container_width=True)
+    
+    with col2:
+        # Implementation cost x savings rate, across every crisis scenario
+        fig = go.Figure(go.Heatmap(
+            x=GRID_AXES['implementation_cost'],
+            y=GRID_AXES['savings_rate'] * 100,
+            z=np.median(grid['roi_percent'], axis=(0, 1)).T,
+            colorscale='RdYlGn',
+            colorbar=dict(title='ROI %')
+        ))
+        fig.update_layout(
+            height=400,
+            title='Median ROI across all crisis scenarios',
+            xaxis_title=AXIS_LABELS['implementation_cost'],
+            yaxis_title='Crisis cost saved (%)',
+            template='plotly_white'
         )
-        
         st.plotly_chart(fig, use_container_width=True)
+    
+    # Tornado: how far ROI moves as each input spans its range
+    base = {
+        'crises_per_year': crises_per_year,
+        'avg_crisis_cost': avg_crisis_cost,
+        'implementation_cost': implementation_cost,
+        'savings_rate': savings_rate
+    }
+    base_roi = float(roi_metrics(**base)['roi_percent'])
+    bars = tornado(base)
+    labels = [AXIS_LABELS[axis] for axis, _, _ in bars]
+    
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        y=labels,
+        x=[low - base_roi for _, low, _ in bars],
+        base=base_roi,
+        orientation='h',
+        name='Input at minimum',
+        marker_color='#ef4444'
+    ))
+    fig.add_trace(go.Bar(
+        y=labels,
+        x=[high - base_roi for _, _, high in bars],
+        base=base_roi,
+        orientation='h',
+        name='Input at maximum',
+        marker_color='#10b981'
+    ))
+    fig.update_layout(
+        barmode='overlay',
+        height=350,
+        title=f'ROI sensitivity around your inputs ({base_roi:,.0f}%)',
+        xaxis_title='ROI (%)',
+        yaxis=dict(autorange='reversed'),
+        template='plotly_white'
+    )
+    st.plotly_chart(fig, use_container_width=True)
+
+@st.cache_data
+def supplier_scatter_figure(suppliers_data):
+    """Supplier risk vs alerts scatter, as a figure spec"""
+    
+    fig = px.scatter(
+        suppliers_data,
+        x='Risk_Score',
+        y='Alerts_Triggered',
+        size='Activity',
+        color='Risk_Score',
+        hover_name='Supplier',
+        hover_data=['Risk_Checks', 'Actions_Taken', 'Monitoring_Status'],
+        title='Supplier Risk vs Alert Frequency',
+        labels={'Risk_Score': 'Risk Score (0-100)', 'Alerts_Triggered': 'Alerts Triggered'},
+        color_continuous_scale=['green', 'yellow', 'red']
+    )
+    
+    fig.update_layout(height=400, template='plotly_white')
+    return fig.to_dict()
 
-def display_supplier_performance():
+def display_supplier_performance(kpis):
     """Display supplier risk tracking"""
     st.markdown('<h2 class="section-title">Supplier Risk Tracking</h2>', unsafe_allow_html=True)
     
-    # Generate sample data
+    counts = kpis['counts']
+    last_seen = kpis['latest'].get('supplier_last_seen', {})
+    suppliers = supplier_frame()
+    risk_scores = dict(zip(suppliers['name'], suppliers['risk_score']))
+    
+    # Suppliers with a risk score or any logged activity
+    names = list(dict.fromkeys(list(risk_scores) + list(last_seen)))
+    active_since = datetime.now() - timedelta(days=7)
+    
     suppliers_data = pd.DataFrame({
-        'Supplier': ['TSMC', 'Samsung', 'Foxconn', 'Intel', 'SK Hynix', 'Micron'],
-        'Risk_Score': [85, 45, 60, 25, 50, 30],
-        'Monitoring_Status': ['Active', 'Active', 'Active', 'Active', 'Active', 'Active'],
-        'Alerts_Triggered': [12, 3, 7, 1, 4, 2],
-        'Actions_Taken': [10, 2, 5, 1, 3, 1]
+        'Supplier': names,
+        'Risk_Score': [int(risk_scores.get(name, 50)) for name in names],
+        'Monitoring_Status': [
+            'Active' if name in last_seen and datetime.fromtimestamp(last_seen[name]) >= active_since else 'Idle'
+            for name in names
+        ],
+        'Risk_Checks': [int(counts.get('supplier_checks', {}).get(name, 0)) for name in names],
+        'Alerts_Triggered': [int(counts.get('supplier_alerts', {}).get(name, 0)) for name in names],
+        'Actions_Taken': [int(counts.get('supplier_actions', {}).get(name, 0)) for name in names]
     })
+    suppliers_data['Activity'] = suppliers_data[['Risk_Checks', 'Alerts_Triggered', 'Actions_Taken']].sum(axis=1) + 1
     
     col1, col2 = st.columns([2, 1])
     
     with col1:
-        fig = px.scatter(
-            suppliers_data,
-            x='Risk_Score',
-            y='Alerts_Triggered',
-            size='Actions_Taken',
-            color='Risk_Score',
-            hover_name='Supplier',
-            title='Supplier Risk vs Alert Frequency',
-            labels={'Risk_Score': 'Risk Score (0-100)', 'Alerts_Triggered': 'Alerts Triggered'},
-            color_continuous_scale=['green', 'yellow', 'red']
-        )
-        
-        fig.update_layout(height=400, template='plotly_white')
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(supplier_scatter_figure(suppliers_data), use_container_width=True)
     
     with col2:
         st.markdown("### Top Risk Suppliers")
@@ -495,8 +715,8 @@ def display_supplier_performance():
             <div style="background: #f9fafb; padding: 1rem; border-radius: 8px; margin-bottom: 0.5rem; border-left: 3px solid {risk_color};">
                 <div style="font-weight: 600; color: #1f2937;">{row['Supplier']}</div>
                 <div style="color: #6b7280; font-size: 0.9rem;">
-                    Risk: {row['Risk_Score']}/100<br>
-                    Alerts: {row['Alerts_Triggered']} | Actions: {row['Actions_Taken']}
+                    Risk: {row['Risk_Score']}/100 ({row['Monitoring_Status']})<br>
+                    Checks: {row['Risk_Checks']} | Alerts: {row['Alerts_Triggered']} | Actions: {row['Actions_Taken']}
                 </div>
             </div>
             """, unsafe_allow_html=True)
@@ -504,8 +724,10 @@ def display_supplier_performance():
 def main():
     """Main dashboard function"""
     
+    kpis = load_kpis()
+    
     display_header()
-    display_key_metrics()
+    display_key_metrics(kpis)
     
     st.markdown("---")
     
@@ -519,11 +741,11 @@ def main():
     
     st.markdown("---")
     
-    display_crisis_breakdown()
+    display_crisis_breakdown(kpis)
     
     st.markdown("---")
     
-    display_supplier_performance()
+    display_supplier_performance(kpis)
     
     st.markdown("---")
     
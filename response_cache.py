@@ -0,0 +1,190 @@
+"""
+Supply Chain Crisis Manager - Prompt response cache
+Answers repeated questions (quick actions, canned scenarios) across sessions.
+Only those canned prompts are cached: a free-text question may lean on
+earlier turns of its own session, so its answer isn't shared.
+"""
+
+import os
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import streamlit as st
+
+from supplier_data import current_dataset_version
+from supply_chain_agent import QUICK_ACTIONS, SCENARIO_PROMPTS, SupplyChainAgent
+
+PROMPT_CACHE_TTL_SECONDS = int(os.getenv('PROMPT_CACHE_TTL_SECONDS', '3600'))
+PROMPT_CACHE_MAX_ENTRIES = int(os.getenv('PROMPT_CACHE_MAX_ENTRIES', '256'))
+
+# Canned prompts answered in the background on start and on dataset change
+PREWARM_ENABLED = os.getenv('PREWARM_ENABLED', 'true').lower() == 'true'
+PREWARM_CONCURRENCY = int(os.getenv('PREWARM_CONCURRENCY', '2'))
+WARM_PROMPTS = [prompt for _, prompt in QUICK_ACTIONS] + list(SCENARIO_PROMPTS.values())
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Case, whitespace and trailing punctuation insensitive form of a prompt"""
+    return re.sub(r'\s+', ' ', prompt).strip().rstrip('.?!').lower()
+
+
+CANNED_PROMPTS = {normalize_prompt(prompt) for prompt in WARM_PROMPTS}
+
+
+def is_canned(prompt: str) -> bool:
+    """Whether prompt is a quick action or scenario prompt, whose answer doesn't depend on the session"""
+    return normalize_prompt(prompt) in CANNED_PROMPTS
+
+
+class PromptCache:
+    """Thread-safe TTL + LRU cache of agent answers for one dataset version"""
+
+    def __init__(self, ttl_seconds: int, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _check_version(self, version):
+        # Answers computed on older risk data are dropped as soon as it changes
+        if version != self.version:
+            self._entries.clear()
+            self.version = version
+
+    def get(self, prompt: str, version: str):
+        """Return {'response', 'cached_at'} for prompt, or None"""
+
+        key = normalize_prompt(prompt)
+
+        with self._lock:
+            self._check_version(version)
+
+            entry = self._entries.get(key)
+            if entry is None or entry['expires_at'] <= time.time():
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return {'response': entry['response'], 'cached_at': entry['cached_at']}
+
+    def set(self, prompt: str, version: str, response: str):
+        """Remember the agent's answer to prompt"""
+
+        key = normalize_prompt(prompt)
+
+        with self._lock:
+            self._check_version(version)
+
+            self._entries[key] = {
+                'response': response,
+                'cached_at': datetime.now(),
+                'expires_at': time.time() + self.ttl_seconds
+            }
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+@st.cache_resource
+def get_prompt_cache() -> PromptCache:
+    """Prompt cache shared by every session in this process"""
+    return PromptCache(PROMPT_CACHE_TTL_SECONDS, PROMPT_CACHE_MAX_ENTRIES)
+
+
+def cached_answer(prompt: str):
+    """Cached answer to a canned prompt for the current datasets, or None"""
+
+    if not is_canned(prompt):
+        return None
+    return get_prompt_cache().get(prompt, current_dataset_version())
+
+
+def remember_answer(prompt: str, response: str):
+    """Cache the agent's answer to a canned prompt for the current datasets"""
+
+    if is_canned(prompt):
+        get_prompt_cache().set(prompt, current_dataset_version(), response)
+
+
+class PromptWarmer:
+    """Runs canned prompts in the background so their first click is a cache hit"""
+
+    def __init__(self, agent, cache: PromptCache, prompts, concurrency: int):
+        self.agent = agent
+        # Held rather than looked up: _warm runs off the script thread
+        self.cache = cache
+        self.prompts = prompts
+        self.version = None
+        self.runs = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='prewarm')
+
+    def ensure_warm(self):
+        """Start a warm pass if the datasets changed since the last one"""
+
+        if not PREWARM_ENABLED or not self.agent.agent_id:
+            return
+
+        version = current_dataset_version()
+
+        with self._lock:
+            if version == self.version:
+                return
+            self.version = version
+
+        for prompt in self.prompts:
+            self._executor.submit(self._warm, prompt, version)
+
+    def _warm(self, prompt: str, version: str):
+        started = time.perf_counter()
+        result = self.agent.invoke_agent(prompt, f"prewarm-{uuid.uuid4().hex[:12]}")
+        seconds = time.perf_counter() - started
+
+        # Skip answers that went stale while the agent was thinking
+        if result["success"] and current_dataset_version() == version:
+            self.cache.set(prompt, version, result["response"])
+
+        with self._lock:
+            self.runs[prompt] = {
+                'version': version,
+                'success': result["success"],
+                'seconds': seconds,
+                'finished_at': datetime.now()
+            }
+        print(f"Pre-warmed prompt in {seconds:.1f}s (success={result['success']}): {prompt[:60]}")
+
+    def summary(self) -> str:
+        """One-line status for the sidebar"""
+
+        # Worker threads add runs while the sidebar reads them
+        with self._lock:
+            runs = [run for run in self.runs.values() if run['version'] == self.version]
+        if not runs:
+            return "Pre-warm: not run"
+
+        warmed = sum(1 for run in runs if run['success'])
+        slowest = max(run['seconds'] for run in runs)
+        return f"Pre-warm: {warmed}/{len(self.prompts)} ready (slowest {slowest:.1f}s)"
+
+
+@st.cache_resource
+def get_prompt_warmer() -> PromptWarmer:
+    """Prompt warmer shared by every session in this process"""
+    return PromptWarmer(SupplyChainAgent(), get_prompt_cache(), WARM_PROMPTS, PREWARM_CONCURRENCY)
@@ -0,0 +1,73 @@
+"""
+Supply Chain Crisis Manager - ROI model
+The Impact Dashboard's ROI formulas, written with NumPy so one call can
+evaluate a single scenario or a whole grid of them by broadcasting
+"""
+
+import numpy as np
+
+# Share of crisis costs the agent saves, unless the user says otherwise
+DEFAULT_SAVINGS_RATE = 0.70
+
+# Values explored by the sensitivity grid (the calculator's input ranges)
+GRID_AXES = {
+    'crises_per_year': np.arange(1, 51, dtype=np.float64),
+    'avg_crisis_cost': np.arange(1.0, 20.5, 0.5),
+    'implementation_cost': np.arange(50, 510, 10, dtype=np.float64),
+    'savings_rate': np.round(np.arange(0.30, 0.951, 0.05), 2)
+}
+
+AXIS_LABELS = {
+    'crises_per_year': "Crises per year",
+    'avg_crisis_cost': "Avg cost per crisis ($M)",
+    'implementation_cost': "Implementation cost ($K)",
+    'savings_rate': "Savings rate"
+}
+
+
+def roi_metrics(crises_per_year, avg_crisis_cost, implementation_cost, savings_rate=DEFAULT_SAVINGS_RATE) -> dict:
+    """Annual crisis cost, savings and net savings ($K), ROI (%) and payback (months)
+
+    Inputs may be scalars or arrays that broadcast against each other.
+    """
+
+    annual_crisis_cost = np.multiply(crises_per_year, avg_crisis_cost) * 1000  # in thousands
+    annual_savings = annual_crisis_cost * savings_rate
+    net_savings = annual_savings - implementation_cost
+
+    return {
+        'annual_crisis_cost': annual_crisis_cost,
+        'annual_savings': annual_savings,
+        'net_savings': net_savings,
+        'roi_percent': net_savings / implementation_cost * 100,
+        'payback_months': implementation_cost / (annual_savings / 12)
+    }
+
+
+def sensitivity_grid() -> dict:
+    """roi_metrics over every combination of GRID_AXES, as 4-D arrays
+
+    Axis order follows GRID_AXES: crises x avg cost x implementation x rate.
+    """
+
+    return roi_metrics(*np.ix_(*GRID_AXES.values()))
+
+
+def tornado(base: dict) -> list:
+    """ROI swing when each input moves across its grid range, others at base
+
+    Returns (axis, roi at the low end, roi at the high end), widest swing first.
+    """
+
+    bars = []
+    for axis, values in GRID_AXES.items():
+        low = dict(base, **{axis: values[0]})
+        high = dict(base, **{axis: values[-1]})
+        bars.append((axis, float(roi_metrics(**low)['roi_percent']), float(roi_metrics(**high)['roi_percent'])))
+
+    return sorted(bars, key=lambda bar: abs(bar[2] - bar[1]), reverse=True)
+
+
+def nearest_index(axis: str, value: float) -> int:
+    """Index of the grid point closest to value on axis"""
+    return int(np.abs(GRID_AXES[axis] - value).argmin())
@@ -0,0 +1,197 @@
+"""
+Supply Chain Crisis Manager - Local risk datasets
+Loads the JSON datasets shipped next to the apps, tracks their version and
+builds the supplier table the dashboards share
+"""
+
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from compile_dataset import compile_bundle
+from lambda1 import DATASET_BUNDLE_KEY, dataset_version
+
+DATA_DIR = os.getenv('DATA_DIR', os.path.dirname(os.path.abspath(__file__)))
+
+DATASET_FILES = ['supplier_risks.json', 'location_risks.json', 'alternatives.json']
+
+# Risk bands used across the dashboards: low below 40, high above 70
+RISK_BANDS = ['Low Risk', 'Medium Risk', 'High Risk']
+
+# (file mtimes, version) of the last hash, so unchanged files are not re-read
+_dataset_version = (None, None)
+
+# (dataset version, frame, index) of the shared supplier table
+_supplier_frame = (None, None, None)
+_supplier_frame_lock = threading.Lock()
+
+
+def load_dataset(filename: str):
+    """Load one of the JSON datasets from DATA_DIR"""
+
+    with open(os.path.join(DATA_DIR, filename), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_bundle():
+    """The compiled dataset bundle, or None if it is missing or older than a source file"""
+
+    path = os.path.join(DATA_DIR, os.path.basename(DATASET_BUNDLE_KEY))
+    try:
+        compiled_at = os.path.getmtime(path)
+    except FileNotFoundError:
+        return None
+
+    if any(os.path.getmtime(os.path.join(DATA_DIR, filename)) > compiled_at for filename in DATASET_FILES):
+        return None
+    return load_dataset(os.path.basename(DATASET_BUNDLE_KEY))
+
+
+def compiled_datasets() -> dict:
+    """The compiled bundle, compiled in memory when there is no fresh one on disk"""
+    return load_bundle() or compile_bundle(*[load_dataset(filename) for filename in DATASET_FILES])
+
+
+def current_dataset_version() -> str:
+    """Content hash of the risk datasets, the same version the Lambda uses"""
+
+    global _dataset_version
+
+    if os.getenv('DATASET_VERSION'):
+        return os.getenv('DATASET_VERSION')
+
+    mtimes = tuple(os.path.getmtime(os.path.join(DATA_DIR, filename)) for filename in DATASET_FILES)
+    if _dataset_version[0] != mtimes:
+        # A fresh bundle already carries the hash
+        bundle = load_bundle()
+        if bundle is not None:
+            _dataset_version = (mtimes, bundle['version'])
+        else:
+            datasets = [load_dataset(filename) for filename in DATASET_FILES]
+            _dataset_version = (mtimes, dataset_version(*datasets))
+
+    return _dataset_version[1]
+
+
+def risk_band_codes(risk_scores) -> np.ndarray:
+    """Index into RISK_BANDS for each score"""
+
+    scores = np.asarray(risk_scores)
+    return np.select([scores > 70, scores >= 40], [2, 1], default=0).astype(np.int8)
+
+
+def build_supplier_frame(bundle: dict) -> pd.DataFrame:
+    """One row per supplier with a risk score, from a compiled dataset bundle
+
+    Location and component come from the supplier's first listing in the
+    alternatives catalog ('Unknown' if it has none). A backup is available
+    when the component has other listed suppliers. Names and reasons are
+    Arrow strings; location, component and status are categoricals.
+    """
+
+    suppliers = bundle['suppliers']
+    names = list(suppliers)
+    locations = [suppliers[name]['location'] for name in names]
+    components = [suppliers[name]['components'][0] if suppliers[name]['components'] else None for name in names]
+    scores = np.array([suppliers[name]['risk_score'] for name in names], dtype=np.int16)
+
+    return pd.DataFrame({
+        'name': pd.array(names, dtype='string[pyarrow]'),
+        'location': pd.Categorical(locations),
+        'component': pd.Categorical([
+            component.replace('_', ' ').title() if component else 'Unknown' for component in components
+        ]),
+        'risk_score': scores,
+        'status': pd.Categorical.from_codes(
+            risk_band_codes(scores),
+            dtype=pd.CategoricalDtype(RISK_BANDS, ordered=True)
+        ),
+        'backup_available': [
+            component is not None and len(bundle['alternatives'][component]) > 1 for component in components
+        ],
+        'location_risk': pd.array([bundle['locations'].get(location) for location in locations], dtype='Int16'),
+        'reason': pd.array([suppliers[name]['reason'] for name in names], dtype='string[pyarrow]')
+    })
+
+
+class SupplierIndex:
+    """Precomputed lookups for filtering the supplier table without scanning it
+
+    Rows sorted by risk score answer the risk band filters with a binary
+    search; each location and the backup flag have a packed bitmap.
+    """
+
+    def __init__(self, frame: pd.DataFrame):
+        self.frame = frame
+        scores = frame['risk_score'].to_numpy()
+        self.size = len(frame)
+        self.by_risk = np.argsort(scores, kind='stable')
+        self.sorted_scores = scores[self.by_risk]
+
+        codes = frame['location'].cat.codes.to_numpy()
+        self.location_bitmaps = {
+            location: np.packbits(codes == code)
+            for code, location in enumerate(frame['location'].cat.categories)
+        }
+        self.backup_bitmap = np.packbits(frame['backup_available'].to_numpy())
+
+    def band_range(self, band: str = None) -> tuple:
+        """(start, stop) into by_risk for one of RISK_BANDS, or all rows"""
+
+        low = np.searchsorted(self.sorted_scores, 40, side='left')
+        high = np.searchsorted(self.sorted_scores, 70, side='right')
+        return {
+            'Low Risk': (0, low),
+            'Medium Risk': (low, high),
+            'High Risk': (high, self.size)
+        }.get(band, (0, self.size))
+
+    def filter(self, locations, band: str = None, backup: bool = None) -> np.ndarray:
+        """Row positions matching the filters, highest risk first"""
+
+        bitmap = np.zeros_like(self.backup_bitmap)
+        for location in locations:
+            if location in self.location_bitmaps:
+                np.bitwise_or(bitmap, self.location_bitmaps[location], out=bitmap)
+
+        if backup is not None:
+            bitmap &= self.backup_bitmap if backup else ~self.backup_bitmap
+
+        start, stop = self.band_range(band)
+        rows = self.by_risk[start:stop][::-1]
+
+        # Test each candidate's bit without unpacking the whole bitmap
+        selected = (bitmap[rows >> 3] >> (7 - (rows & 7))) & 1
+        return rows[selected.astype(bool)]
+
+
+def _current_supplier_table() -> tuple:
+    global _supplier_frame
+
+    version = current_dataset_version()
+    if _supplier_frame[0] == version:
+        return _supplier_frame
+
+    with _supplier_frame_lock:
+        if _supplier_frame[0] != version:
+            frame = build_supplier_frame(compiled_datasets())
+            _supplier_frame = (version, frame, SupplierIndex(frame))
+
+    return _supplier_frame
+
+
+def supplier_frame() -> pd.DataFrame:
+    """The supplier table for the current datasets, shared by every session
+
+    Built once per dataset version and handed out without copying, so
+    callers must treat it as read-only (filtering returns new frames).
+    """
+    return _current_supplier_table()[1]
+
+
+def supplier_index() -> SupplierIndex:
+    """The SupplierIndex over supplier_frame(); its .frame is that table"""
+    return _current_supplier_table()[2]
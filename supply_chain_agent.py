@@ -0,0 +1,433 @@
+"""
+Supply Chain Crisis Manager - Bedrock Agent client
+Shared by the Streamlit chat apps (Chatbot.py, newapp.py)
+"""
+
+import boto3
+from botocore.config import Config
+from botocore.exceptions import (
+    ClientError, ConnectionError as BotocoreConnectionError, ReadTimeoutError, ResponseStreamingError
+)
+import streamlit as st
+from urllib3.exceptions import ProtocolError, ReadTimeoutError as StreamReadTimeoutError
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+import queue
+import random
+import threading
+import time
+import uuid
+from datetime import datetime
+import os
+
+from agent_trace import AGENT_TRACE_ENABLED, AgentTrace, write_trace
+from intent_router import FAST_PATH_ENABLED, IntentRouter
+from supplier_data import DATA_DIR
+
+# 'bedrock', or 'local' for the in-process stand-in that runs the real
+# tool functions on the local datasets (see local_agent.py)
+AGENT_BACKEND = os.getenv('AGENT_BACKEND', 'bedrock').lower()
+
+# Connections kept open to Bedrock, shared by every browser session
+BEDROCK_MAX_POOL_CONNECTIONS = int(os.getenv('BEDROCK_MAX_POOL_CONNECTIONS', '50'))
+
+# Agent invocations running in the background, across all sessions
+AGENT_WORKERS = int(os.getenv('AGENT_WORKERS', '16'))
+
+# Resilience: overall deadline per question, retries with jittered
+# exponential backoff, a stream-idle timeout, and optional hedging (a
+# duplicate request when no answer has started by the p95 first-byte time;
+# first questions of a session only)
+AGENT_DEADLINE_SECONDS = float(os.getenv('AGENT_DEADLINE_SECONDS', '120'))
+AGENT_MAX_RETRIES = int(os.getenv('AGENT_MAX_RETRIES', '3'))
+AGENT_BACKOFF_BASE_SECONDS = float(os.getenv('AGENT_BACKOFF_BASE_SECONDS', '1'))
+AGENT_BACKOFF_MAX_SECONDS = float(os.getenv('AGENT_BACKOFF_MAX_SECONDS', '20'))
+AGENT_STREAM_IDLE_SECONDS = float(os.getenv('AGENT_STREAM_IDLE_SECONDS', '60'))
+AGENT_HEDGE_ENABLED = os.getenv('AGENT_HEDGE_ENABLED', 'false').lower() == 'true'
+AGENT_HEDGE_MIN_SAMPLES = int(os.getenv('AGENT_HEDGE_MIN_SAMPLES', '20'))
+
+RETRYABLE_ERROR_CODES = {
+    'ThrottlingException', 'throttlingException',
+    'ServiceUnavailableException', 'serviceUnavailableException',
+    'InternalServerException', 'internalServerException',
+    'ModelNotReadyException', 'modelNotReadyException'
+}
+
+# Recent time-to-first-byte samples, used for the hedging threshold
+_first_byte_latencies = deque(maxlen=200)
+
+# Sessions that have asked before. Only first questions are hedged: the hedge
+# runs in a Bedrock session of its own, which has none of the conversation.
+_sessions_seen = OrderedDict()
+_sessions_seen_lock = threading.Lock()
+SESSIONS_SEEN_MAX = 100000
+
+# Canned prompts: chat quick actions and dashboard crisis scenarios
+QUICK_ACTIONS = [
+    ("Analyze TSMC Risk", "Analyze the risk level for TSMC supplier in Taiwan"),
+    ("Taiwan Earthquake Impact", "A 7.2 earthquake hit Taiwan affecting TSMC. Analyze impact and provide recommendations."),
+    ("Find Alternatives", "Find alternative suppliers for semiconductors if TSMC is affected"),
+    ("Procurement Plan", "Generate procurement recommendations for a crisis affecting TSMC with critical urgency")
+]
+
+SCENARIO_PROMPTS = {
+    "Taiwan Earthquake (7.2 magnitude affecting TSMC)":
+        "A 7.2 magnitude earthquake has hit Taiwan affecting TSMC semiconductor facilities. Calculate the crisis impact and provide procurement recommendations with critical urgency.",
+    "Shanghai Port Congestion (14-day delays)":
+        "Shanghai port is experiencing 14-day shipping delays affecting Foxconn assembly operations. Analyze the impact and find alternative suppliers for assembly services.",
+    "South Korea Manufacturing Strike":
+        "Manufacturing strikes in South Korea are affecting Samsung memory chip production. Assess the risk and generate procurement recommendations."
+}
+
+
+@st.cache_resource
+def get_bedrock_agent_runtime(region: str):
+    """Process-wide bedrock-agent-runtime client
+
+    boto3 clients are thread-safe, so every Streamlit session reuses this one
+    client, its connection pool and its resolved credentials.
+    """
+
+    return boto3.client(
+        'bedrock-agent-runtime',
+        region_name=region,
+        config=Config(
+            max_pool_connections=BEDROCK_MAX_POOL_CONNECTIONS,
+            tcp_keepalive=True,
+            # A stalled completion stream fails after this many idle seconds
+            read_timeout=AGENT_STREAM_IDLE_SECONDS,
+            # Retries are handled by SupplyChainAgent.stream_agent
+            retries={'mode': 'standard', 'total_max_attempts': 1}
+        )
+    )
+
+
+@st.cache_resource
+def get_local_agent_runtime():
+    """Process-wide local stand-in for the bedrock-agent-runtime client"""
+
+    from local_agent import LocalAgentRuntime
+    return LocalAgentRuntime()
+
+
+@st.cache_resource
+def get_intent_router() -> IntentRouter:
+    """Fast-path router (and its hit rate) shared by every session"""
+
+    # Direct answers read the same data as the agent's tools
+    return IntentRouter(DATA_DIR if AGENT_BACKEND == 'local' else '')
+
+
+class AgentTimeoutError(TimeoutError):
+    """The agent did not answer within AGENT_DEADLINE_SECONDS"""
+
+
+def is_retryable(error: Exception) -> bool:
+    """Whether a failed invocation is worth retrying (throttling, 5xx, stalls)"""
+
+    # Stalled or dropped event streams surface as urllib3 errors: botocore
+    # reads the response body straight from urllib3
+    if isinstance(error, (ReadTimeoutError, BotocoreConnectionError, ResponseStreamingError,
+                          StreamReadTimeoutError, ProtocolError)):
+        return True
+    if isinstance(error, ClientError):
+        return error.response.get('Error', {}).get('Code') in RETRYABLE_ERROR_CODES
+    return False
+
+
+def backoff_delay(attempt: int) -> float:
+    """Exponential backoff with full jitter"""
+    return random.uniform(0, min(AGENT_BACKOFF_MAX_SECONDS, AGENT_BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+
+def first_byte_p95():
+    """p95 of recent time-to-first-byte, or None until there are enough samples"""
+
+    samples = sorted(_first_byte_latencies)
+    if len(samples) < AGENT_HEDGE_MIN_SAMPLES:
+        return None
+    return samples[int(len(samples) * 0.95) - 1]
+
+
+def first_turn(session_id: str) -> bool:
+    """Whether this is the session's first question; remembers the session"""
+
+    with _sessions_seen_lock:
+        if session_id in _sessions_seen:
+            _sessions_seen.move_to_end(session_id)
+            return False
+        _sessions_seen[session_id] = True
+        if len(_sessions_seen) > SESSIONS_SEEN_MAX:
+            _sessions_seen.popitem(last=False)
+        return True
+
+
+@st.cache_resource
+def get_agent_executor():
+    """Process-wide pool that runs agent invocations off the script thread"""
+    return ThreadPoolExecutor(max_workers=AGENT_WORKERS, thread_name_prefix='bedrock-agent')
+
+
+class AgentJob:
+    """A background agent invocation, polled by the UI on later reruns"""
+
+    def __init__(self, prompt: str, session_id: str):
+        self.request_id = uuid.uuid4().hex[:12]
+        self.prompt = prompt
+        self.session_id = session_id
+        self.submitted_at = datetime.now()
+        self.started = False
+        self.done = False
+        self.success = True
+        self.text = ""
+        self.stats = {}
+
+    def run(self, agent):
+        """Stream the agent's answer into self.text (runs on the executor)"""
+
+        self.started = True
+
+        try:
+            for chunk_text in agent.stream_agent(self.prompt, self.session_id, self.stats):
+                self.text += chunk_text
+        except Exception as e:
+            self.text = f"Error: {str(e)}"
+            self.success = False
+        finally:
+            self.done = True
+
+
+def submit_agent_job(agent, prompt: str, session_id: str) -> AgentJob:
+    """Start an agent invocation in the background and return its job"""
+
+    job = AgentJob(prompt, session_id)
+    get_agent_executor().submit(job.run, agent)
+    return job
+
+
+class SupplyChainAgent:
+    """Supply Chain Crisis Manager AI Agent"""
+
+    def __init__(self):
+        self.agent_id = os.getenv('BEDROCK_AGENT_ID')
+        self.agent_alias_id = os.getenv('BEDROCK_AGENT_ALIAS_ID')
+        self.region = os.getenv('AWS_REGION', 'us-east-1')
+
+        # Answer templated questions by calling the tools directly. The router
+        # is resolved here, on the script thread: stream_agent runs on the
+        # executor, where Streamlit's cached resources can't be looked up.
+        self.fast_path_enabled = FAST_PATH_ENABLED
+        self.intent_router = get_intent_router()
+
+        if AGENT_BACKEND == 'local':
+            self.agent_id = self.agent_id or 'local-agent'
+            self.agent_alias_id = self.agent_alias_id or 'local'
+            self.bedrock_agent_runtime = get_local_agent_runtime()
+        else:
+            self.bedrock_agent_runtime = get_bedrock_agent_runtime(self.region)
+        print(self.agent_id)
+
+    def stream_agent(self, prompt: str, session_id: str, stats: dict = None):
+        """Yield the Bedrock Agent's response text as chunks arrive
+
+        Templated questions are answered by the fast path when it is enabled.
+        Throttling and stalled streams are retried with jittered backoff as
+        long as no text has been yielded yet, all within one deadline.
+        If given, stats is filled with time_to_first_byte, total_time
+        (seconds), retries, hedged, fast_path and the invocation's AgentTrace.
+        """
+
+        if stats is None:
+            stats = {}
+
+        trace = AgentTrace(prompt, session_id)
+        stats['trace'] = trace
+        stats['retries'] = 0
+        stats['hedged'] = False
+        stats['fast_path'] = False
+
+        deadline = time.perf_counter() + AGENT_DEADLINE_SECONDS
+
+        try:
+            direct = None
+            if self.fast_path_enabled:
+                started = trace.elapsed()
+                direct = self.intent_router.answer(prompt)
+
+            if direct is not None:
+                trace.add_tool_call(f"fast_path.{direct['function']}", started, trace.elapsed(), direct['params'])
+                stats['fast_path'] = True
+                stats['time_to_first_byte'] = trace.time_to_first_byte = trace.elapsed()
+                yield direct['response']
+
+            hedge = direct is None and AGENT_HEDGE_ENABLED and first_turn(session_id)
+            attempt = 0
+            while direct is None:
+                try:
+                    for text in self._stream_attempt(prompt, session_id, trace, stats, deadline, hedge):
+                        if 'time_to_first_byte' not in stats:
+                            stats['time_to_first_byte'] = trace.time_to_first_byte = trace.elapsed()
+                            _first_byte_latencies.append(trace.time_to_first_byte)
+                        yield text
+                    break
+
+                except Exception as e:
+                    # Text already shown to the user can't be taken back
+                    if 'time_to_first_byte' in stats or attempt >= AGENT_MAX_RETRIES or not is_retryable(e):
+                        raise
+
+                    delay = backoff_delay(attempt)
+                    if time.perf_counter() + delay >= deadline:
+                        raise
+
+                    attempt += 1
+                    stats['retries'] = trace.retries = attempt
+                    print(f"Agent call failed ({str(e)}), retry {attempt} in {delay:.1f}s")
+                    time.sleep(delay)
+
+            trace.finish(success=True)
+
+        except Exception as e:
+            trace.finish(success=False, error=str(e))
+            raise
+
+        finally:
+            if trace.total_seconds is None:
+                trace.finish(success=False, error="Stream closed early")
+            stats['total_time'] = trace.total_seconds
+            write_trace(trace)
+
+    def _pump(self, prompt: str, session_id: str, tag: int, events: queue.Queue, cancelled: threading.Event):
+        """Read one invocation's completion stream into the events queue"""
+
+        try:
+            response = self.bedrock_agent_runtime.invoke_agent(
+                agentId=self.agent_id,
+                agentAliasId=self.agent_alias_id,
+                sessionId=session_id,
+                inputText=prompt,
+                enableTrace=AGENT_TRACE_ENABLED,
+                streamingConfigurations={'streamFinalResponse': True}
+            )
+
+            completion = response['completion']
+            for event in completion:
+                if cancelled.is_set():
+                    completion.close()
+                    return
+                events.put((tag, event, None))
+
+            events.put((tag, None, None))
+
+        except Exception as e:
+            events.put((tag, None, e))
+
+    def _stream_attempt(self, prompt: str, session_id: str, trace: AgentTrace, stats: dict, deadline: float,
+                        hedge: bool = False):
+        """One invocation, hedged (if allowed) when it is slower than usual to start answering
+
+        Streams are read on helper threads so the deadline holds even while a
+        read is blocked. The first request to produce text (or finish) wins;
+        the other one is cancelled.
+        """
+
+        events = queue.Queue()
+        cancelled = {}
+        pending_traces = {}
+        active = set()
+
+        def launch(tag, launch_session_id):
+            cancelled[tag] = threading.Event()
+            pending_traces[tag] = []
+            active.add(tag)
+            threading.Thread(
+                target=self._pump,
+                args=(prompt, launch_session_id, tag, events, cancelled[tag]),
+                daemon=True
+            ).start()
+
+        def choose(tag):
+            for other, flag in cancelled.items():
+                if other != tag:
+                    flag.set()
+            # Only the winner's trace events make it into the timeline
+            for at, trace_event in pending_traces[tag]:
+                trace.add(trace_event, at)
+            return tag
+
+        started = time.perf_counter()
+        hedge_after = first_byte_p95() if hedge else None
+        winner = None
+
+        launch(0, session_id)
+
+        try:
+            while active:
+                now = time.perf_counter()
+                if now >= deadline:
+                    raise AgentTimeoutError(f"No complete answer within {AGENT_DEADLINE_SECONDS:.0f}s")
+
+                hedge_due = winner is None and hedge_after is not None and 1 not in cancelled
+                wait = deadline - now
+                if hedge_due:
+                    wait = min(wait, max(0.0, started + hedge_after - now))
+
+                try:
+                    tag, event, error = events.get(timeout=wait)
+                except queue.Empty:
+                    if hedge_due and time.perf_counter() >= started + hedge_after:
+                        launch(1, f"{session_id}-hedge")
+                        stats['hedged'] = trace.hedged = True
+                    continue
+
+                if winner is not None and tag != winner:
+                    continue
+
+                if error is not None:
+                    active.discard(tag)
+                    if winner == tag or not active:
+                        raise error
+                    continue
+
+                if event is None:
+                    if winner is None:
+                        winner = choose(tag)
+                    return
+
+                if 'trace' in event:
+                    if winner is None:
+                        pending_traces[tag].append((trace.elapsed(), event['trace']))
+                    else:
+                        trace.add(event['trace'])
+
+                elif 'chunk' in event and 'bytes' in event['chunk']:
+                    if winner is None:
+                        winner = choose(tag)
+                    yield event['chunk']['bytes'].decode('utf-8')
+
+        finally:
+            for flag in cancelled.values():
+                flag.set()
+
+    def invoke_agent(self, prompt: str, session_id: str):
+        """Send message to the Bedrock Agent"""
+
+        stats = {}
+
+        try:
+            full_response = "".join(self.stream_agent(prompt, session_id, stats))
+
+            return {
+                "response": full_response,
+                "success": True,
+                "timestamp": datetime.now(),
+                **stats
+            }
+
+        except Exception as e:
+            return {
+                "response": f"Error: {str(e)}",
+                "success": False,
+                "timestamp": datetime.now(),
+                **stats
+            }
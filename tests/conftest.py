@@ -0,0 +1,15 @@
+"""Shared test setup: run the apps on the local agent backend, off AWS"""
+
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Read at import time by the modules under test
+os.environ.setdefault('AGENT_BACKEND', 'local')
+os.environ.setdefault('LOCAL_AGENT_MODEL_SECONDS', '0')
+os.environ.setdefault('LOCAL_AGENT_CHUNK_SECONDS', '0')
+os.environ.setdefault('PREWARM_ENABLED', 'false')
+os.environ.setdefault('CHAT_TRANSCRIPT_DB', os.path.join(tempfile.mkdtemp(), 'chat_transcripts.db'))
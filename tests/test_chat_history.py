@@ -0,0 +1,58 @@
+"""Chat history: spilling, ordering and transcript retention"""
+
+import sqlite3
+import time
+
+from chat_history import ChatHistory, prune_transcripts
+
+
+def stored_sessions(db_path) -> set:
+    with sqlite3.connect(db_path) as db:
+        return {session_id for (session_id,) in db.execute("SELECT DISTINCT session_id FROM messages")}
+
+
+def chat(db_path, session_id: str, count: int) -> ChatHistory:
+    history = ChatHistory(session_id, max_in_memory=3, db_path=str(db_path))
+    for index in range(count):
+        history.append({'role': 'user', 'content': f"{session_id} {index}"})
+    return history
+
+
+def test_history_reads_back_spilled_messages(tmp_path):
+    history = chat(tmp_path / 'chat.db', 'a', 8)
+
+    assert len(list(history)) == 3
+    assert [message['content'] for message in history.history()] == [f"a {index}" for index in range(8)]
+
+
+def test_answer_lands_next_to_a_spilled_question(tmp_path):
+    history = ChatHistory('a', max_in_memory=3, db_path=str(tmp_path / 'chat.db'))
+    history.append({'content': 'question', 'request_id': 'r1'})
+    for index in range(5):
+        history.append({'content': f"later {index}"})
+
+    history.insert_after('r1', {'content': 'answer', 'request_id': 'r1'})
+
+    assert [message['content'] for message in history.history()][:3] == ['question', 'answer', 'later 0']
+
+
+def test_clear_deletes_the_transcript(tmp_path):
+    db_path = tmp_path / 'chat.db'
+    history = chat(db_path, 'a', 8)
+    chat(db_path, 'b', 8)
+
+    history.clear()
+
+    assert stored_sessions(db_path) == {'b'}
+
+
+def test_abandoned_transcripts_are_pruned(tmp_path):
+    db_path = tmp_path / 'chat.db'
+    chat(db_path, 'abandoned', 8)
+    with sqlite3.connect(db_path) as db:
+        db.execute("UPDATE sessions SET spilled_at = ?", (time.time() - 3600,))
+
+    chat(db_path, 'recent', 8)
+    assert prune_transcripts(str(db_path), max_age_seconds=60) == 5
+
+    assert stored_sessions(db_path) == {'recent'}
@@ -0,0 +1,74 @@
+"""Action group Lambda: request cache versioning and supplier lookups"""
+
+import json
+import os
+import shutil
+import time
+
+import pytest
+
+import lambda1
+from conftest import ROOT
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    """A copy of the source datasets with nothing compiled or published"""
+
+    for key in lambda1.SOURCE_DATASETS:
+        shutil.copy(os.path.join(ROOT, key), tmp_path / key)
+    with lambda1.datasets_from(str(tmp_path)):
+        yield tmp_path
+
+
+def call(function_name, **params) -> dict:
+    event = {
+        'actionGroup': 'SupplyChainActions',
+        'function': function_name,
+        'parameters': [{'name': name, 'value': value} for name, value in params.items()]
+    }
+    response = lambda1.lambda_handler(event, None)
+    return json.loads(response['response']['functionResponse']['responseBody']['TEXT']['body'])
+
+
+def test_unpublished_data_is_versioned_by_content(data_dir):
+    first = call('analyze_supplier_risk', supplier_name='TSMC', location='Taiwan')
+
+    supplier_risks = json.loads((data_dir / 'supplier_risks.json').read_text())
+    supplier_risks['TSMC']['risk_score'] = 10
+    (data_dir / 'supplier_risks.json').write_text(json.dumps(supplier_risks))
+    os.utime(data_dir / 'supplier_risks.json', (time.time() + 5, time.time() + 5))
+
+    second = call('analyze_supplier_risk', supplier_name='TSMC', location='Taiwan')
+    assert second['risk_score'] != first['risk_score']
+
+
+def test_cached_bodies_get_a_fresh_timestamp(data_dir):
+    first = call('analyze_supplier_risk', supplier_name='Samsung', location='South Korea')
+    time.sleep(0.01)
+    second = call('analyze_supplier_risk', supplier_name='Samsung', location='South Korea')
+
+    assert second['risk_score'] == first['risk_score']
+    assert second['timestamp'] > first['timestamp']
+
+
+def test_mis_cased_supplier_resolves_through_the_bundle(data_dir):
+    from compile_dataset import compile_bundle
+    from build_risk_view import load_sources
+
+    bundle = compile_bundle(*load_sources(str(data_dir)))
+    (data_dir / lambda1.DATASET_BUNDLE_KEY).write_text(json.dumps(bundle))
+
+    exact = call('analyze_supplier_risk', supplier_name='SK Hynix', location='South Korea')
+    mis_cased = call('analyze_supplier_risk', supplier_name='sk-HYNIX', location='South Korea')
+
+    assert mis_cased['supplier_name'] == 'SK Hynix'
+    assert mis_cased['risk_score'] == exact['risk_score']
+    assert mis_cased['risk_factors'] != 'Unknown supplier'
+
+
+def test_mis_cased_supplier_resolves_without_a_bundle(data_dir):
+    result = call('analyze_supplier_risk', supplier_name='tsmc', location='Taiwan')
+
+    assert result['supplier_name'] == 'TSMC'
+    assert result['risk_factors'] != 'Unknown supplier'
@@ -0,0 +1,57 @@
+"""Prompt cache: canned prompts are shared, free-text questions are not"""
+
+import os
+import time
+
+from streamlit.testing.v1 import AppTest
+
+from conftest import ROOT
+from response_cache import cached_answer, get_prompt_cache, is_canned, remember_answer
+from supply_chain_agent import QUICK_ACTIONS
+
+FOLLOW_UP = "What about the second one?"
+
+
+def ask(app: AppTest, prompt: str) -> dict:
+    """Send prompt from the chat box and return the agent's reply"""
+
+    app.text_input(key='chat_input').input(prompt)
+    next(button for button in app.button if button.label == 'Send').click()
+    app.run()
+
+    deadline = time.time() + 30
+    while app.session_state['pending_requests'] and time.time() < deadline:
+        time.sleep(0.1)
+        app.run()
+    assert not app.session_state['pending_requests']
+
+    return app.session_state['messages'].tail(1)[0]
+
+
+def test_canned_prompts_are_shared():
+    _, prompt = QUICK_ACTIONS[0]
+    remember_answer(prompt, "TSMC is high risk")
+
+    assert is_canned(prompt.upper())
+    assert cached_answer(f"  {prompt.upper()}? ")['response'] == "TSMC is high risk"
+
+
+def test_free_text_answers_are_not_cached():
+    remember_answer(FOLLOW_UP, "The second supplier is Samsung")
+
+    assert not is_canned(FOLLOW_UP)
+    assert cached_answer(FOLLOW_UP) is None
+
+
+def test_follow_up_is_not_shared_across_sessions():
+    sessions = [AppTest.from_file(os.path.join(ROOT, 'newapp.py'), default_timeout=60) for _ in range(2)]
+    hits = get_prompt_cache().hits
+
+    for app in sessions:
+        app.run()
+        reply = ask(app, FOLLOW_UP)
+        assert reply['role'] == 'agent'
+        assert 'cached_at' not in reply
+
+    assert get_prompt_cache().hits == hits
+    assert sessions[0].session_state['session_id'] != sessions[1].session_state['session_id']